@@ -0,0 +1,377 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+    qt-builder 自身开销的基准测试
+
+    生成一个只有目录结构的假QT源码树, configure/qmake/make 由一个python脚本
+    代替, 按照指定的行数, 行宽和速率输出编译信息. 测量的是qt-builder自己
+    (输出转发, 界面更新, 调度, 示例安装)消耗的时间, 与实际的编译时间无关.
+
+        python3 benchmarks/qtbench.py
+        python3 benchmarks/qtbench.py --lines 200000 --rate 0 -j 4 --json a.json
+
+    输出各项的吞吐量(行/秒, MB/秒), 每个模块的额外开销和内存峰值,
+    --json 把结果保存下来, 方便比较不同版本的数据
+"""
+import sys
+import os
+import time
+import json
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtbuilder.modules  import KNOWN_MODULES, queryModuleList
+from qtbuilder.builder  import QTBuilder
+from qtbuilder.logpump  import BuildLogDir, treeSize
+from qtbuilder.examples import ExampleInstaller
+from qtbuilder.cli      import ConsoleUi
+
+"""
+    代替 configure, qmake 和 make 的脚本. 参数从环境变量 QTBENCH_CONFIG
+    指定的JSON文件中读取:
+        lines: make 输出的行数, cfglines: configure/qmake 输出的行数,
+        width: 每行的宽度, rate: 每秒输出的行数(0表示不限制)
+"""
+STUB_SCRIPT = r'''
+import sys, os, json, time
+
+def emit(count, width, rate, fmt) :
+    out   = sys.stdout
+    batch = max(1, min(1000, rate // 100)) if rate else 1000
+    start = time.perf_counter()
+    for first in range(0, count, batch) :
+        lines = []
+        for i in range(first, min(count, first + batch)) :
+            line = fmt.format(i)
+            lines.append(line.ljust(width - 1, '_') + '\n')
+        out.write(''.join(lines))
+        if rate :
+            out.flush()
+            delay = start + (first + batch) / rate - time.perf_counter()
+            if delay > 0 :
+                time.sleep(delay)
+    out.flush()
+
+def main() :
+    with open(os.environ['QTBENCH_CONFIG']) as file :
+        cfg = json.load(file)
+    tool    = sys.argv[1]
+    targets = [it for it in sys.argv[2:] if not it.startswith('-')]
+    target  = targets[0] if targets else 'all'
+    name    = os.path.basename(os.getcwd())
+    if tool in ('configure', 'qmake') :
+        emit(cfg['cfglines'], cfg['width'], 0,
+             'Checking for feature ' + name + '_{0}... yes')
+    elif target == 'all' :
+        emit(cfg['lines'], cfg['width'], cfg['rate'],
+             'g++ -c -pipe -O2 -std=gnu++11 -Wall -W -fPIC -I../include '
+             '-o .obj/' + name + '_{0}.o ../src/' + name + '_{0}.cpp')
+    else :
+        emit(cfg['cfglines'], cfg['width'], 0,
+             'install -m 644 -p ' + name + '_{0}.h /opt/qt/include/')
+
+main()
+'''
+
+class BenchTree :
+    def __init__(self, root, opts) :
+        self.root    = root
+        self.srcpath = os.path.join(root, 'src')
+        self.dstpath = os.path.join(root, 'prefix')
+        self.stub    = os.path.join(root, 'stub.py')
+        self.config  = os.path.join(root, 'stub.json')
+        self.opts    = opts
+
+    def create    (self) :
+        """
+            生成源码树: 每个模块一个目录, 带有examples, qtbase中有
+            configure; 安装路径中预先放好qmake
+        """
+        with open(self.stub, 'w') as file :
+            file.write(STUB_SCRIPT)
+        with open(self.config, 'w') as file :
+            json.dump({'lines'   : self.opts.lines,
+                       'cfglines': self.opts.cfglines,
+                       'width'   : self.opts.width,
+                       'rate'    : self.opts.rate}, file)
+
+        for name in self.moduleNames() :
+            path = os.path.join(self.srcpath, name)
+            self.createExamples(os.path.join(path, 'examples'))
+        self.createTool(os.path.join(self.srcpath, 'qtbase'), 'configure')
+        self.createTool(os.path.join(self.dstpath, 'bin'), 'qmake')
+    def createTool(self, path, tool) :
+        os.makedirs(path, exist_ok = True)
+        if sys.platform == "win32" :
+            with open(os.path.join(path, tool + '.bat'), 'w') as file :
+                file.write('@"{0}" "{1}" {2} %*\n'.format(sys.executable,
+                                                          self.stub,
+                                                          tool))
+            return
+        name = os.path.join(path, tool)
+        with open(name, 'w') as file :
+            file.write('#!/bin/sh\nexec "{0}" "{1}" {2} "$@"\n'.format(
+                sys.executable, self.stub, tool))
+        os.chmod(name, 0o755)
+    def createExamples(self, path) :
+        data = b'x' * self.opts.example_bytes
+        for i in range(self.opts.examples) :
+            subdir = os.path.join(path, 'example{0:02d}'.format(i // 20))
+            os.makedirs(subdir, exist_ok = True)
+            with open(os.path.join(subdir, 'main{0}.cpp'.format(i)), 'wb') as f :
+                f.write(data)
+    def moduleNames(self) :
+        names = [it for it in KNOWN_MODULES 
+                 if KNOWN_MODULES[it]['selected'] and it != 'qtbase']
+        return ['qtbase'] + sorted(names)[:self.opts.modules - 1]
+    def makecmd   (self) :
+        return '"{0}" "{1}" make'.format(sys.executable, self.stub)
+    def buildArgs (self, jobs) :
+        modules = queryModuleList(self.srcpath)
+        return {
+            'srcpath' : self.srcpath,
+            'dstpath' : self.dstpath,
+            'confarg' : '-opensource -confirm-license',
+            'makecmd' : self.makecmd(),
+            'makearg' : '',
+            'makedoc' : 0,
+            'skiperr' : 0,
+            'modjobs' : jobs,
+            'modlist' : [it for it in modules if it.selected],
+            'bldpath' : os.path.join(self.root, 'build'),
+        }
+    def moduleLines(self) :
+        # 每个模块: configure/qmake, make, make install
+        return self.opts.cfglines * 2 + self.opts.lines
+
+def peakRss() :
+    """ 本进程和子进程的内存峰值(MB), 不支持的平台返回None """
+    try :
+        import resource
+    except ImportError :
+        return None, None
+    scale = 1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0
+    own   = resource.getrusage(resource.RUSAGE_SELF    ).ru_maxrss / scale
+    child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(child, 1)
+
+def runBuild(tree, jobs, verbose) :
+    ui      = ConsoleUi(verbose, open(os.devnull, 'w'))
+    args    = tree.buildArgs(jobs)
+    builder = QTBuilder(ui)
+    start   = time.perf_counter()
+    builder.buildQt(**args)
+    builder.worker.join()
+    elapsed = time.perf_counter() - start
+    ui.stream.close()
+    if not builder.retcode :
+        raise RuntimeError("编译失败, 请查看 {0}".format(builder.logpath))
+    return elapsed, len(args['modlist']), builder.logpath
+
+def runStubs(tree) :
+    """ 直接执行各个模块的命令(不经过qt-builder), 作为比较的基准 """
+    modules = [it for it in queryModuleList(tree.srcpath) if it.selected]
+    bldroot = os.path.join(tree.root, 'baseline')
+    start   = time.perf_counter()
+    for mod in modules :
+        bldpath = os.path.join(bldroot, mod.name)
+        os.makedirs(bldpath, exist_ok = True)
+        if mod.name == 'qtbase' :
+            cmds = ['"{0}/qtbase/configure" -prefix "{1}"'.format(
+                tree.srcpath, tree.dstpath)]
+        else :
+            cmds = ['"{0}/bin/qmake" "{1}/{2}"'.format(
+                tree.dstpath, tree.srcpath, mod.name)]
+        cmds += [tree.makecmd(), tree.makecmd() + ' install']
+        for cmd in cmds :
+            subprocess.check_call(cmd, shell = True, cwd = bldpath,
+                                  stdout = subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def benchPipeline(tree, opts, results) :
+    baseline = runStubs(tree)
+    elapsed, count, logpath = runBuild(tree, opts.jobs, opts.verbose)
+    lines    = tree.moduleLines() * count
+    logsize  = lines * opts.width
+    results['pipeline'] = {
+        'modules'           : count,
+        'seconds'           : round(elapsed, 3),
+        'baseline_seconds'  : round(baseline, 3),
+        'overhead_per_module': round((elapsed - baseline) / count, 4),
+        'lines_per_second'  : round(lines / elapsed),
+        'log_mb_per_second' : round(logsize / elapsed / 1e6, 2),
+        'log_compression'   : round(logsize / max(1, treeSize(logpath)), 1),
+        'peak_rss_mb'       : peakRss()[0],
+    }
+    # 没有任何变化时再编译一次, 所有阶段都被跳过, 剩下的都是qt-builder自己
+    # 的开销(检查源码, 构建戳, 示例)
+    elapsed, count, logpath = runBuild(tree, opts.jobs, opts.verbose)
+    results['noop_rebuild'] = {
+        'seconds'           : round(elapsed, 3),
+        'seconds_per_module': round(elapsed / count, 4),
+        'peak_rss_mb'       : peakRss()[0],
+    }
+
+def benchRunCommand(tree, opts, results) :
+    """ 单个命令的输出转发: 子进程 -> 读取线程 -> 日志文件 + 界面 """
+    ui      = ConsoleUi(opts.verbose, open(os.devnull, 'w'))
+    builder = QTBuilder(ui)
+    builder.logs    = BuildLogDir(os.path.join(tree.root, 'runcommand-logs'))
+    logpath = builder.logs.create()
+    cwd     = os.path.join(tree.root, 'runcommand')
+    os.makedirs(cwd, exist_ok = True)
+
+    start   = time.perf_counter()
+    code    = builder.runCommand(tree.makecmd(), cwd, dict(os.environ))[0]
+    elapsed = time.perf_counter() - start
+    ui.stream.close()
+    if code != 0 :
+        raise RuntimeError("命令执行失败: {0}".format(code))
+
+    logsize = opts.lines * opts.width
+    results['runCommand'] = {
+        'lines'            : opts.lines,
+        'seconds'          : round(elapsed, 3),
+        'lines_per_second' : round(opts.lines / elapsed),
+        'mb_per_second'    : round(logsize / elapsed / 1e6, 2),
+        'log_compression'  : round(logsize / max(1, treeSize(logpath)), 1),
+        'peak_rss_mb'      : peakRss()[0],
+    }
+
+def benchUiSink(tree, opts, results) :
+    """
+        界面输出: 一个线程不停地写入, 测量全部显示到Text控件所用的时间.
+        需要图形界面, 没有显示器时跳过
+    """
+    try :
+        import tkinter as tk
+        from qtbuilder.gui import UiLogSink
+        root = tk.Tk()
+    except Exception as e :
+        results['UiLogSink'] = {'skipped': str(e).strip()}
+        return
+    root.withdraw()
+    view = tk.Text(root)
+    sink = UiLogSink(root)
+    sink.addView('detail', view, 5000)
+
+    line  = 'g++ -c -O2 -o file.o file.cpp'.ljust(opts.width - 1, '_') + '\n'
+    count = opts.lines
+    def producer() :
+        for i in range(0, count, 64) :
+            sink.write('detail', line * min(64, count - i))
+        sink.call(root.quit)
+
+    start  = time.perf_counter()
+    thread = threading.Thread(target = producer)
+    thread.start()
+    root.mainloop()
+    elapsed = time.perf_counter() - start
+    thread.join()
+    root.destroy()
+    results['UiLogSink'] = {
+        'lines'            : count,
+        'seconds'          : round(elapsed, 3),
+        'lines_per_second' : round(count / elapsed),
+        'peak_rss_mb'      : peakRss()[0],
+    }
+
+def benchExamples(tree, opts, results) :
+    """ 示例安装: 第一次全部复制, 第二次全部跳过 """
+    src   = os.path.join(tree.srcpath, 'qtbase', 'examples')
+    dst   = os.path.join(tree.root, 'examples-bench')
+    size  = opts.examples * opts.example_bytes
+    for name in ('cold', 'warm') :
+        installer = ExampleInstaller(hardlink = opts.hardlink)
+        start     = time.perf_counter()
+        copied, skipped = installer.install(src, dst).result()
+        elapsed   = time.perf_counter() - start
+        installer.shutdown()
+        results['examples_' + name] = {
+            'files'           : copied + skipped,
+            'copied'          : copied,
+            'seconds'         : round(elapsed, 4),
+            'files_per_second': round((copied + skipped) / elapsed),
+            'mb_per_second'   : round(size / elapsed / 1e6, 2) if copied else None,
+        }
+
+BENCHMARKS = [
+    ('pipeline'  , benchPipeline  ),
+    ('runcommand', benchRunCommand),
+    ('uisink'    , benchUiSink    ),
+    ('examples'  , benchExamples  ),
+]
+
+def parseCommandLine(argv) :
+    parser = argparse.ArgumentParser(
+        prog        = "qtbench",
+        description = "测量qt-builder自身的开销")
+    parser.add_argument("--modules", type = int, default = 8,
+                        help = "假源码树中的模块数")
+    parser.add_argument("--lines", type = int, default = 50000,
+                        help = "每个模块 make 输出的行数")
+    parser.add_argument("--cfglines", type = int, default = 200,
+                        help = "configure/qmake/make install 输出的行数")
+    parser.add_argument("--width", type = int, default = 160,
+                        help = "每行的宽度(字节)")
+    parser.add_argument("--rate", type = int, default = 0,
+                        help = "每秒输出的行数, 0表示不限制")
+    parser.add_argument("--examples", type = int, default = 500,
+                        help = "每个模块的示例文件数")
+    parser.add_argument("--example-bytes", type = int, default = 16384,
+                        help = "每个示例文件的大小")
+    parser.add_argument("--hardlink", action = "store_true",
+                        help = "示例安装使用硬链接")
+    parser.add_argument("-j", "--jobs", type = int, default = 1,
+                        help = "同时编译的模块数")
+    parser.add_argument("-v", "--verbose", action = "store_true",
+                        help = "经过writeDetail输出详细信息(写入空设备)")
+    parser.add_argument("--only", action = "append",
+                        choices = [it[0] for it in BENCHMARKS],
+                        help = "只运行指定的测试, 可以重复")
+    parser.add_argument("--workdir",
+                        help = "假源码树的位置, 默认使用临时目录并在结束后删除")
+    parser.add_argument("--json", metavar = "FILE",
+                        help = "把结果保存为JSON文件")
+    return parser.parse_args(argv[1:])
+
+def main(argv) :
+    opts = parseCommandLine(argv)
+    root = opts.workdir or tempfile.mkdtemp(prefix = 'qtbench-')
+    os.makedirs(root, exist_ok = True)
+    # 假工具链通过环境变量找到配置文件
+    tree = BenchTree(root, opts)
+    os.environ['QTBENCH_CONFIG'] = tree.config
+
+    results = {}
+    try :
+        tree.create()
+        for name, func in BENCHMARKS :
+            if opts.only and name not in opts.only :
+                continue
+            print("运行 {0}......".format(name), end = '', flush = True)
+            func(tree, opts, results)
+            print("完成")
+    finally :
+        if not opts.workdir :
+            shutil.rmtree(root, ignore_errors = True)
+
+    own, child = peakRss()
+    results['peak_rss_mb'] = {'self': own, 'children': child}
+    print()
+    for name, values in results.items() :
+        print(name)
+        for key, value in values.items() :
+            print("    {0:<22} {1}".format(key, value))
+    if opts.json :
+        with open(opts.json, 'w') as file :
+            json.dump(results, file, indent = 2)
+    return 0
+
+if __name__ == '__main__' :
+    sys.exit(main(sys.argv))
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+    用于编译QT源码的工具库, 可以在其他脚本中直接使用:
+
+        import qtbuilder
+        mods = qtbuilder.queryModuleList(srcpath)
+
+    导入本包不会导入tkinter, 也不会创建任何窗口. 各个子模块只在第一次
+    访问对应的名称时才会被导入, 以便命令行和其他脚本尽快启动.
+"""
+import importlib
+
+_EXPORTS = {
+    'ModuleType'        : 'modules',
+    'KNOWN_MODULES'     : 'modules',
+    'queryModuleList'   : 'modules',
+    'ModuleGraph'       : 'graph',
+    'QT_CONFIGS'        : 'configs',
+    'BuildScheduler'    : 'scheduler',
+    'Fingerprint'       : 'fingerprint',
+    'JobServer'         : 'jobserver',
+    'MemoryThrottle'    : 'throttle',
+    'ResourceProfiler'  : 'profiler',
+    'FingerprintEngine' : 'fingerprint',
+    'BuildLog'          : 'logpump',
+    'BuildLogDir'       : 'logpump',
+    'OutputPump'        : 'logpump',
+    'BuildStamp'        : 'stamp',
+    'BuildJournal'      : 'journal',
+    'ArtifactCache'     : 'artifacts',
+    'DiagnosticIndex'   : 'diagnostics',
+    'CompilerCache'     : 'ccache',
+    'ExampleInstaller'  : 'examples',
+    'BuildScriptWriter' : 'script',
+    'BuildTrace'        : 'trace',
+    'QTBuilder'         : 'builder',
+    'ConsoleUi'         : 'cli',
+    'main'              : 'cli',
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name) :
+    if name not in _EXPORTS :
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(
+            __name__, name))
+    module = importlib.import_module('.' + _EXPORTS[name], __name__)
+    value  = getattr(module, name)
+    globals()[name] = value
+    return value
+
+def __dir__() :
+    return __all__
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+    python -m qtbuilder: 不带参数时启动图形界面, 否则使用命令行
+"""
+import sys
+
+from .cli import main
+
+sys.exit(main(sys.argv))
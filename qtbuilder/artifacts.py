@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+    模块安装结果(产物)的缓存
+"""
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+
+"""
+    产物缓存：
+        保存每个模块 make install 安装的全部文件, 以模块源码摘要, 编译参数,
+        工具链和依赖模块的产物摘要组成的 key 索引. 同样的QT版本和参数在
+        其他机器或者其他安装路径上编译时, 直接恢复这些文件, 不需要配置和
+        编译.
+        文件内容按照SHA-256保存在 objects/ 中(相同的文件只保存一份), 每个
+        模块的文件清单保存在 entries/<key>.json 中. 包含安装路径的文件在
+        恢复时替换为新的安装路径: 文本文件直接替换; 二进制文件(例如qmake和
+        QtCore中的 qt_prfxpath)中只替换以NUL结尾的字符串, 新路径必须能放入
+        原来的位置, 否则这个模块不从缓存恢复.
+        所有文件的总大小超过 maxbytes 时, 删除最久没有使用的模块. 缓存目录
+        可以由多个进程共享, 最近 GRACE 秒内写入或者使用过的文件即使还没有
+        被清单引用(其他进程正在保存)也不会被删除.
+        文件都按块读写, 内存中最多只有一个需要替换安装路径的文件.
+"""
+class ArtifactCache :
+    CHUNKSIZE = 1 << 20
+    GRACE     = 3600
+
+    def __init__(self, root, maxbytes = 8 << 30) :
+        self.root     = os.path.abspath(root)
+        self.objects  = os.path.join(self.root, 'objects')
+        self.entries  = os.path.join(self.root, 'entries')
+        self.maxbytes = maxbytes
+        self.lock     = threading.Lock()
+        os.makedirs(self.objects, exist_ok = True)
+        os.makedirs(self.entries, exist_ok = True)
+
+    def entryPath (self, key) :
+        return os.path.join(self.entries, key + '.json')
+    def objectPath(self, digest) :
+        return os.path.join(self.objects, digest[:2], digest)
+    def lookup    (self, key) :
+        """ key对应的文件清单, 不存在时返回None """
+        try :
+            with open(self.entryPath(key), encoding = 'utf-8') as file :
+                return json.load(file)
+        except (OSError, ValueError) :
+            return None
+    def store     (self, key, stage, prefix, module = None) :
+        """
+            保存stage中的文件(make install INSTALL_ROOT=stage 的结果),
+            prefix是它们原本的安装路径. 返回保存的文件数
+        """
+        # 清理缓存时会删除没有被清单引用的文件, 保存过程中不能清理
+        with self.lock :
+            return self.storeTree(key, stage, prefix, module)
+    def storeTree (self, key, stage, prefix, module) :
+        old   = prefixPattern(prefix)
+        # 跨越两块数据的路径也要能找到
+        tail  = len(os.fsencode(os.path.normpath(prefix))) + 1
+        files = []
+        links = []
+        for root, dirs, names in os.walk(stage) :
+            for name in dirs + names :
+                path    = os.path.join(root, name)
+                relpath = os.path.relpath(path, stage).replace(os.sep, '/')
+                if os.path.islink(path) :
+                    links.append([relpath, os.readlink(path)])
+                elif name in names :
+                    files.append(self.storeFile(path, relpath, old, tail))
+        manifest = {
+            'module': module,
+            'prefix': prefix,
+            'files' : files,
+            'links' : links,
+            'size'  : sum(it['size'] for it in files)
+        }
+        path = self.entryPath(key)
+        temp = tempName(path)
+        with open(temp, 'w', encoding = 'utf-8') as file :
+            json.dump(manifest, file)
+        os.replace(temp, path)
+        self.evict()
+        return len(files)
+    def storeFile (self, path, relpath, old, tail) :
+        hasher = hashlib.sha256()
+        size   = 0
+        found  = False
+        binary = False
+        last   = b''
+        with open(path, 'rb') as file :
+            while True :
+                data = file.read(ArtifactCache.CHUNKSIZE)
+                if not data :
+                    break
+                hasher.update(data)
+                size  += len(data)
+                binary = binary or b'\0' in data
+                if not found :
+                    found = old.search(last + data) is not None
+                    last  = data[-tail:]
+        digest = hasher.hexdigest()
+        reloc  = None
+        if found :
+            reloc = 'binary' if binary else 'text'
+        target = self.objectPath(digest)
+        if os.path.exists(target) :
+            # 更新修改时间, 其他进程清理缓存时不会删除它
+            os.utime(target)
+        else :
+            os.makedirs(os.path.dirname(target), exist_ok = True)
+            temp = tempName(target)
+            shutil.copyfile(path, temp)
+            os.replace(temp, target)
+        return {
+            'path'  : relpath,
+            'digest': digest,
+            'size'  : size,
+            'mode'  : os.stat(path).st_mode & 0o7777,
+            'reloc' : reloc
+        }
+    def restore   (self, key, prefix) :
+        """
+            把key对应的文件恢复到prefix中, 返回恢复的文件数. 缓存中没有
+            这个模块或者不能转换到新的安装路径时返回None, 不改动prefix
+        """
+        manifest = self.lookup(key)
+        if manifest is None :
+            return None
+        old = prefixPattern(manifest['prefix'])
+        new = os.fsencode(os.path.normpath(prefix))
+        # 先检查所有文件都存在并且能够替换安装路径, 任何一个文件失败都
+        # 不恢复这个模块. 检查时逐个读取, 不保留替换的结果
+        for it in manifest['files'] :
+            source = self.objectPath(it['digest'])
+            if not os.path.isfile(source) :
+                return None
+            if it['reloc'] is not None and \
+               self.relocated(source, old, new, it['reloc']) is None :
+                return None
+
+        for it in manifest['files'] :
+            source = self.objectPath(it['digest'])
+            target = os.path.join(prefix, it['path'])
+            os.makedirs(os.path.dirname(target), exist_ok = True)
+            temp = target + '.qtbuilder-tmp'
+            if it['reloc'] is None :
+                shutil.copyfile(source, temp)
+            else :
+                with open(temp, 'wb') as file :
+                    file.write(self.relocated(source, old, new, it['reloc']))
+            os.chmod(temp, it['mode'])
+            os.replace(temp, target)
+        for relpath, link in manifest['links'] :
+            target = os.path.join(prefix, relpath)
+            os.makedirs(os.path.dirname(target), exist_ok = True)
+            removePath(target)
+            os.symlink(os.fsdecode(old.sub(lambda m : new,
+                                           os.fsencode(link))),
+                       target)
+        # 清单的修改时间即最近一次使用的时间
+        try :
+            os.utime(self.entryPath(key))
+        except OSError :
+            pass
+        return len(manifest['files'])
+    def relocated (self, source, old, new, kind) :
+        with open(source, 'rb') as file :
+            return relocate(file.read(), old, new, kind)
+    def evict     (self) :
+        """ 删除最久没有使用的模块, 直到总大小不超过maxbytes """
+        recent  = time.time() - ArtifactCache.GRACE
+        entries = []
+        for it in os.scandir(self.entries) :
+            if not it.name.endswith('.json') :
+                continue
+            try :
+                with open(it.path, encoding = 'utf-8') as file :
+                    files = json.load(file)['files']
+                entries.append((it.stat().st_mtime, it.path, files))
+            except (OSError, ValueError, KeyError) :
+                continue
+        entries.sort()
+
+        # 同样的文件可能被多个模块引用, 没有模块引用时才删除
+        refs  = {}
+        sizes = {}
+        for _, _, files in entries :
+            for it in files :
+                refs [it['digest']] = refs.get(it['digest'], 0) + 1
+                sizes[it['digest']] = it['size']
+        total = sum(sizes.values())
+        while entries and total > self.maxbytes :
+            _, path, files = entries.pop(0)
+            os.remove(path)
+            for it in files :
+                refs[it['digest']] -= 1
+                if refs[it['digest']] == 0 :
+                    total -= sizes[it['digest']]
+
+        for root, dirs, names in os.walk(self.objects) :
+            for name in names :
+                if refs.get(name) :
+                    continue
+                path = os.path.join(root, name)
+                try :
+                    if os.path.getmtime(path) >= recent :
+                        continue
+                    os.remove(path)
+                except OSError :
+                    pass
+        return total
+
+def installTree(source, target) :
+    """
+        把source中的文件和链接复制到target中. target中已有的同名文件或者
+        链接(例如 libQt5Core.so.5)先被删除, 不能像copytree那样直接创建
+    """
+    for root, dirs, names in os.walk(source) :
+        dest = os.path.normpath(os.path.join(target,
+                                             os.path.relpath(root, source)))
+        os.makedirs(dest, exist_ok = True)
+        for name in dirs + names :
+            path = os.path.join(root, name)
+            out  = os.path.join(dest, name)
+            if os.path.islink(path) :
+                removePath(out)
+                os.symlink(os.readlink(path), out)
+            elif name in names :
+                temp = tempName(out)
+                shutil.copy2(path, temp)
+                if os.path.isdir(out) and not os.path.islink(out) :
+                    shutil.rmtree(out)
+                os.replace(temp, out)
+            elif os.path.lexists(out) and not os.path.isdir(out) :
+                removePath(out)
+def removePath(path) :
+    if os.path.islink(path) or os.path.isfile(path) :
+        os.remove(path)
+    elif os.path.isdir(path) :
+        shutil.rmtree(path)
+
+def tempName(path) :
+    # 多个进程或者线程可能同时写入同样的文件
+    return "{0}.{1}-{2}.tmp".format(path, os.getpid(), threading.get_ident())
+
+def prefixPattern(prefix) :
+    # 安装路径在文件中可能使用 / 或者 \\ 分隔, 后面不能紧跟路径名中的字符
+    prefix = os.path.normpath(prefix)
+    forms  = set([prefix, prefix.replace('\\', '/')])
+    return re.compile(b'(?:' + b'|'.join(re.escape(os.fsencode(it))
+                                         for it in sorted(forms)) +
+                      b')(?![\\w.+-])')
+
+def relocate(data, old, new, kind) :
+    """
+        把data中的安装路径(old是prefixPattern的结果)替换为new. 二进制文件
+        中包含路径的字符串变长时只能占用它后面的NUL, 放不下时返回None
+    """
+    if kind == 'text' :
+        return old.sub(lambda m : new, data)
+    data = bytearray(data)
+    pos  = 0
+    while True :
+        match = old.search(data, pos)
+        if match is None :
+            break
+        start = match.start()
+        end   = data.find(b'\0', start)
+        if end < 0 :
+            return None
+        value = old.sub(lambda m : new, bytes(data[start:end]))
+        # 字符串后面至少保留一个NUL
+        space = end
+        while space < len(data) and data[space] == 0 :
+            space += 1
+        if start + len(value) >= space :
+            return None
+        data[start:space] = value + b'\0' * (space - start - len(value))
+        pos = start + len(value)
+    return bytes(data)
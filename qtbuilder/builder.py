@@ -0,0 +1,1000 @@
+# -*- coding: utf-8 -*-
+"""
+    QT源码的编译过程
+"""
+import subprocess
+import sys
+import os
+import threading
+import functools
+import shutil
+import re
+
+from .modules     import ModuleType
+from .graph       import ModuleGraph, estimateWeights
+from .scheduler   import BuildScheduler
+from .fingerprint import FingerprintEngine
+from .logpump     import BuildLogDir, OutputPump, streamName
+from .stamp       import BuildStamp, stampKey
+from .ccache      import CompilerCache, hitRate
+from .examples    import ExampleInstaller
+from .trace       import BuildTrace, waitProcess
+from .diagnostics import DiagnosticIndex, readLogLine
+from .jobserver   import JobServer, isGnuMake, stripJobs
+from .throttle    import MemoryThrottle
+from .journal     import BuildJournal
+from .progress    import BuildProgress
+from .profiler    import ResourceProfiler
+from .artifacts   import ArtifactCache, installTree
+from .prefix      import readRecord, writeRecord, qmakePath, queryQmake, \
+                         sourceVersion, samePath
+
+
+# 由make执行的阶段, 这些阶段使用jobserver
+MAKE_PHASES = ('make', 'install', 'docs', 'install_docs')
+
+class QTBuilder :
+    def __init__(self, mainWindow) :
+        self.ui = mainWindow
+        # runCommand 使用的编译状态, 由 buildQt 和 setupBuildEnv 设置
+        self.serial    = True
+        self.logs      = None
+        self.diagindex = None
+        self.jobserver = None
+        self.progress  = None
+        self.profiler  = None
+
+    def buildQt (self, **args) :
+        self.srcpath = args['srcpath']
+        self.dstpath = args['dstpath']
+        self.confarg = args['confarg']
+        self.makecmd = args['makecmd']
+        self.makearg = args['makearg']
+        self.makedoc = args['makedoc']
+        self.skiperr = args['skiperr']
+        self.modlist = args['modlist']
+        self.modjobs = max(1, int(args.get('modjobs', 1)))
+        self.docjobs = max(1, int(args.get('docjobs', 1)))
+        # 只有一个编译任务并且不生成文档时, 输出才不会交错
+        self.serial  = self.modjobs == 1 and not self.makedoc
+        # 继续上次中断的编译时, 不清除上次的编译结果
+        self.resume  = args.get('resume', False)
+        self.cleanbld = args.get('cleanbld', False) and not self.resume
+        self.journal = None
+        # 产物缓存目录(空表示不使用)及其大小上限(MB)
+        self.artifactdir = args.get('artifacts', '')
+        self.artifactcap = int(args.get('artifactcap', 8192)) << 20
+        self.artifacts = None
+        self.restored = set()
+        self.stored  = set()
+        # 安装路径中已有兼容的qtbase, 没有重新编译的模块
+        self.reused  = set()
+        self.progress = None
+        # 每隔 profinterval 秒采样编译命令的资源使用, 0表示不采样
+        self.profinterval = float(args.get('profile', 1.0))
+        self.profiler = None
+        self.bldroot = os.path.abspath(args.get('bldpath', 'build'))
+        self.logroot = os.path.join(self.bldroot, 'logs')
+        self.logpath = self.logroot
+        self.logkeep = max(1, int(args.get('logkeep', 10)))
+        self.logcap  = int(args.get('logcap', 512)) << 20
+        self.logs    = None
+        self.diagindex = None
+        self.trace   = BuildTrace()
+        self.buildenv = None
+        self.modkeys = {}
+        self.fingerprints = {}
+        self.ccache  = args.get('ccache', '')
+        self.ccachearg = args.get('ccachearg', '')
+        self.compilerCache = None
+        self.cachestats = {}
+        self.exmlink = args.get('exmlink', False)
+        self.examples = None
+        self.exmtasks = []
+        # 所有make共享的任务数, 缺省为CPU数
+        self.makejobs = int(args.get('makejobs', 0)) or os.cpu_count() or 1
+        self.usejobserver = args.get('jobserver', True) and \
+                            isGnuMake(self.makecmd)
+        self.jobserver = None
+        self.tokenlock = threading.Lock()
+        # 资源耗尽时编译阶段最多重试的次数
+        self.retries = max(0, int(args.get('retries', 2)))
+        self.retried = []
+        # 可用内存低于 memlow(MB, 0表示自动)时减少编译任务
+        self.memlow  = int(args.get('memlow', 0)) << 20
+        self.usethrottle = args.get('memthrottle', True)
+        self.throttle = None
+        self.throttlelog = None
+
+        self.retcode = False
+
+        self.worker = threading.Thread(target = self.qtBuildThread,
+                                       name   = 'worker')
+        self.worker.start()
+    
+    def setupBuildEnv(self) :
+        self.ui.writeBrief("准备编译环境......")
+        #1. 生成编译命令使用的环境变量, 本进程的环境变量保持不变
+        if sys.platform == "win32" :
+            path  = [self.srcpath + '/gnuwin32/bin',
+                     self.dstpath + '/bin',
+                     "C:\\mingw\\x64\\bin"]
+        else:
+            path  = [self.dstpath + '/bin']
+        self.buildenv = dict(os.environ)
+        self.buildenv['PATH'] = os.pathsep.join(
+            [self.buildenv.get('PATH', '')] + path)
+        
+        self.toolchain = self.toolchainId()
+        self.portabletc = self.toolchainId(portable = True)
+
+        if self.ccache and not self.setupCompilerCache() :
+            return False
+
+        if self.usejobserver :
+            self.makearg   = stripJobs(self.makearg)
+            try :
+                self.jobserver = JobServer(self.makejobs).start()
+            except :
+                self.ui.writeBrief ("失败\n")
+                self.ui.writeDetail(str(sys.exc_info()) + "\n")
+                return False
+
+        #2. 创建用于进行shadow build的目录, 除非要求完全重新构建, 否则保留
+        #   上次的编译结果, 由各个模块的构建戳决定哪些阶段需要重新执行
+        try :
+            if self.cleanbld and os.path.exists(self.bldroot) :
+                self.cleanBuildRoot()
+            os.makedirs(self.bldroot, exist_ok = True)
+            # 每次编译的日志, 诊断信息索引和计时记录保存在单独的目录中
+            self.logs    = BuildLogDir(self.logroot, self.logkeep, self.logcap)
+            self.logpath = self.logs.create()
+            self.diagindex = DiagnosticIndex(
+                os.path.join(self.logpath, 'qt-build.diag'))
+            self.journal = BuildJournal(self.bldroot, self.journalKey())
+            resumed = self.journal.open(self.resume)
+            if self.artifactdir :
+                self.artifacts = ArtifactCache(self.artifactdir,
+                                               self.artifactcap)
+        except:
+            self.ui.writeBrief ("失败\n")
+            err  = str(sys.exc_info())
+            err += "\n"
+            self.ui.writeDetail(err)
+            return False
+
+        #3. 内存节流通过jobserver的任务名额实现
+        if self.jobserver is not None and self.usethrottle and \
+           MemoryThrottle.supported() :
+            self.throttle = MemoryThrottle(self.jobserver, 
+                                           self.memlow,
+                                           report = self.writeThrottle)
+            self.throttle.start()
+            self.ui.writeDetail("可用内存低于 {0} MB 时减少编译任务\n",
+                                self.throttle.low >> 20)
+
+        #4. 资源使用的时间序列保存在本次编译的日志目录中
+        if self.profinterval > 0 and ResourceProfiler.supported() :
+            try :
+                self.profiler = ResourceProfiler(
+                    os.path.join(self.logpath, 'qt-build.profile.tsv'),
+                    self.profinterval).start()
+            except :
+                self.ui.writeBrief ("失败\n")
+                self.ui.writeDetail(str(sys.exc_info()) + "\n")
+                return False
+        self.ui.writeBrief("成功\n")
+        if resumed :
+            self.ui.writeBrief("继续上次的编译, 已经完成 {0} 个阶段\n",
+                               len(self.journal.done))
+        elif self.resume :
+            self.ui.writeBrief("没有上次的编译记录或者编译参数已经改变, "
+                               "重新开始编译\n")
+        return True
+    def cleanBuildRoot(self) :
+        # 以前各次编译的日志, 计时和进度记录(logs目录)用于比较和估计
+        # 编译时间, 完全重新构建时也保留
+        for it in os.scandir(self.bldroot) :
+            if it.path == self.logroot :
+                continue
+            if it.is_dir(follow_symlinks = False) :
+                shutil.rmtree(it.path)
+            else :
+                os.remove(it.path)
+    def journalKey   (self) :
+        # 编译参数相同时才能继续上次的编译. 任务数不影响编译结果
+        return stampKey('journal',
+                        self.srcpath,
+                        self.dstpath,
+                        self.confarg,
+                        self.cacheArgs(),
+                        self.makecmd,
+                        stripJobs(self.makearg),
+                        self.toolchain)
+    def writeThrottle(self, text) :
+        # 节流记录写入本次编译的日志目录
+        self.ui.writeDetail(text + "\n")
+        if self.throttlelog is None :
+            self.throttlelog = self.logs.open(None, 'throttle')
+        self.throttlelog.write((text + "\n").encode('utf-8'))
+    def setupCompilerCache(self) :
+        if not self.ccachearg :
+            self.ui.writeBrief ("失败\n")
+            self.ui.writeDetail("当前配置不支持编译缓存, 请选择支持编译缓存的"
+                                "预设参数\n")
+            return False
+        wrapper = self.ccache.split()[0]
+        if not shutil.which(wrapper, path = self.buildenv['PATH']) :
+            self.ui.writeBrief ("失败\n")
+            self.ui.writeDetail("找不到编译缓存程序: {0}\n", wrapper)
+            return False
+        self.compilerCache = CompilerCache(self.ccache, self.ccachearg)
+        return True
+    def clearBuildEnv(self) :
+        self.buildenv = None
+        if self.throttle is not None :
+            self.throttle.stop()
+        if self.profiler is not None :
+            self.profiler.stop()
+            self.profiler = None
+        if self.throttlelog is not None :
+            self.logs.release(self.throttlelog)
+            self.throttlelog = None
+        if self.jobserver is not None :
+            self.jobserver.stop()
+            self.jobserver = None
+        if self.diagindex is not None :
+            self.diagindex.close()
+        if self.journal is not None :
+            self.journal.close()
+            self.journal = None
+        if self.logs is not None :
+            self.logs = None
+            # 日志目录存在时才保存计时记录
+            tracepath = os.path.join(self.logpath, 'qt-build.trace.json')
+            try :
+                self.trace.save(tracepath)
+                self.ui.writeDetail("计时记录: {0}\n", tracepath)
+            except :
+                err  = str(sys.exc_info())
+                err += "\n"
+                self.ui.writeDetail(err)
+    def toolchainId  (self, portable = False) :
+        # 工具链标识: 编译命令和编译器的位置, 大小以及修改时间. portable
+        # 为真时不包括修改时间, 其他机器上同样的编译器得到同样的标识.
+        # platform模块导入较慢, 只在需要时导入
+        import platform
+        items = [platform.system(), platform.machine(), self.makecmd]
+        tools = self.makecmd.split()[:1]
+        tools = tools + ['cc', 'c++', 'gcc', 'g++', 'clang', 'clang++', 'cl']
+        for it in tools :
+            path = shutil.which(it, path = self.buildenv['PATH'])
+            if not path :
+                continue
+            st = os.stat(path)
+            if portable :
+                items.append([it, path, st.st_size])
+            else :
+                items.append([it, path, st.st_size, st.st_mtime_ns])
+        return stampKey(*items)
+    def moduleKeys   (self, mod) :
+        if mod.name in self.modkeys :
+            return self.modkeys[mod.name]
+
+        srcfp = self.fingerprints[mod.name].digest
+        names = [it.name for it in self.modlist]
+        deps  = [self.modkeys[it]['install'] if it in self.modkeys else ''
+                 for it in mod.dependence if it in names]
+        keys  = {}
+        keys['setup'    ] = stampKey('setup',
+                                     self.confarg,
+                                     self.cacheArgs(),
+                                     self.dstpath,
+                                     self.toolchain)
+        keys['configure'] = stampKey(keys['setup'], srcfp, deps)
+        keys['make'     ] = stampKey(keys['configure'],
+                                     self.makecmd,
+                                     self.makearg)
+        keys['install'  ] = stampKey(keys['make'], self.dstpath)
+        keys['docs'     ] = stampKey(keys['install'])
+        # 产物缓存的key与安装路径和本机无关, 依赖模块使用它们的产物key
+        arts = [self.modkeys[it]['artifact'] if it in self.modkeys else it
+                for it in mod.dependence if it in names]
+        keys['artifact' ] = stampKey('artifact',
+                                     mod.name,
+                                     srcfp,
+                                     self.confarg,
+                                     self.makecmd,
+                                     stripJobs(self.makearg),
+                                     self.portabletc,
+                                     arts)
+        keys['installed'] = stampKey('installed',
+                                     keys['artifact'],
+                                     self.dstpath)
+        keys['restore'  ] = stampKey(keys['setup'], keys['installed'])
+        # 依赖此模块的模块把它的摘要计入自己的摘要, 此模块发生变化时
+        # 它们也会被重新构建
+        self.modkeys[mod.name] = keys
+        return keys
+    def phaseKey     (self, mod, phase) :
+        # 没有构建戳的阶段(install_docs)使用文档的摘要
+        keys = self.moduleKeys(mod)
+        return keys.get(phase, keys['docs'])
+    def scanSources  (self) :
+        self.ui.writeBrief("检查源码变化......")
+        cachedir = os.path.join(self.bldroot, '.fingerprint')
+        engine   = FingerprintEngine(self.srcpath, cachedir)
+        start    = self.trace.now()
+        try :
+            self.fingerprints = engine.scan([it.name for it in self.modlist])
+            self.trace.addSpan("检查源码变化", 'build', start)
+        except:
+            self.ui.writeBrief ("失败\n")
+            err  = str(sys.exc_info())
+            err += "\n"
+            self.ui.writeDetail(err)
+            return False
+
+        changed = [it for it in self.fingerprints.values() if it.changed]
+        self.ui.writeBrief("成功(共 {0} 个模块发生变化)\n", len(changed))
+        for it in changed :
+            self.ui.writeDetail("{0}: {1} 个文件发生变化\n",
+                                it.name,
+                                len(it.changed))
+        return True
+    def moduleEnv    (self, mod) :
+        # 每个模块使用独立的环境变量副本, 互不影响
+        env = dict(self.buildenv)
+        if self.compilerCache is not None :
+            bldpath = os.path.join(self.bldroot, mod.name)
+            self.compilerCache.moduleEnv(env, bldpath)
+        return env
+    def cacheArgs    (self) :
+        if self.compilerCache is None :
+            return ''
+        return self.compilerCache.qmakeArgs()
+    def buildQtMods  (self) :
+        total = len(self.modlist)
+        self.ui.writeBrief("\n开始编译QT功能模块(共 {0} 个, 同时编译 {1} 个)\n",
+                           total,
+                           self.modjobs)
+        if self.jobserver is not None :
+            self.ui.writeBrief("所有make共享 {0} 个编译任务(jobserver)\n",
+                               self.makejobs)
+        if self.makedoc :
+            self.ui.writeBrief("模块安装以后即生成文档(同时生成 {0} 个)\n",
+                               self.docjobs)
+        self.ui.writeBrief("\n")
+
+        # 示例在后台安装, 与后面模块的编译同时进行
+        self.examples = ExampleInstaller(hardlink = self.exmlink,
+                                         trace    = self.trace)
+        try :
+            # 以前编译的耗时用于估计关键路径, 关键路径上的模块优先编译,
+            # 同时用于估计整体进度
+            weights = estimateWeights(self.logroot)
+            graph   = ModuleGraph(self.modlist, weights)
+            self.progress = BuildProgress(
+                [it.name for it in self.modlist],
+                os.path.join(self.logroot, 'qt-build.progress.json'),
+                weights,
+                report = self.ui.setStatusText).start()
+            cycle = graph.findCycle()
+            if cycle :
+                self.ui.writeBrief("警告: 模块之间存在循环依赖 {0}\n\n",
+                                   " -> ".join(cycle))
+            sched = BuildScheduler(self.modjobs)
+            sched.setLimit('docs', self.docjobs)
+            for it in self.modlist :
+                sched.addTask(it.name,
+                              functools.partial(self.buildModule, it),
+                              it.dependence,
+                              priority = graph.critical[it.name])
+            if self.makedoc :
+                for it in self.modlist :
+                    sched.addTask(it.name + ':docs',
+                                  functools.partial(self.buildDoc, it),
+                                  self.docDeps(it),
+                                  'docs')
+            retcode = sched.run(keepGoing = self.skiperr,
+                                onSkip    = self.writeSkipped)
+            self.writeTaskErrors(sched)
+            self.writeFailSummary(sched)
+            self.writeCacheSummary()
+            self.writeArtifactSummary()
+            self.writeDiagSummary()
+            self.writeThrottleSummary()
+            self.writeRetrySummary()
+            self.writeProfileSummary()
+
+            if not self.waitExamples() and not self.skiperr :
+                retcode = False
+        finally :
+            if self.progress is not None :
+                self.progress.stop()
+            self.examples.shutdown()
+        return retcode
+    def buildModule  (self, mod) :
+        self.progress.startModule(mod.name)
+        ok = False
+        try :
+            ok = self.buildMod(mod)
+        finally :
+            self.progress.finishModule(mod.name, ok)
+        return ok
+    def buildMod     (self, mod) :
+        if self.serial :
+            self.ui.clearDetail()
+        self.ui.writeBrief("{0}\n{1}: {2}\n",
+                           self.moduleTag(mod),
+                           str(mod.type),
+                           mod.description)
+
+        bldpath = os.path.join(self.bldroot, mod.name)
+        stamp   = BuildStamp(bldpath, self.moduleKeys(mod))
+        if not stamp.isDone('setup') :
+            # 配置参数或者工具链发生了变化, 清除旧的编译结果. 只是源码
+            # 发生变化时, 重新配置以后增量编译即可
+            if os.path.exists(bldpath) :
+                shutil.rmtree(bldpath)
+            os.makedirs(bldpath)
+            stamp.markDone('setup')
+
+        if mod.type == ModuleType.QTBASE and self.reuseQtBase(mod) :
+            self.installExamples(mod)
+            return True
+        if self.restoreArtifact(mod, stamp) :
+            self.recordQtBase(mod)
+            self.installExamples(mod)
+            return True
+        # 重新编译的模块会覆盖从产物缓存恢复的文件
+        stamp.clear('restore')
+
+        if not self.runPhase(mod, "配置模块", self.configureCmd(mod), bldpath,
+                             stamp, 'configure') :
+            return False
+
+        compiled = self.compilerCache is not None and \
+                   not stamp.isDone('make')
+        if compiled :
+            self.compilerCache.resetStats(bldpath)
+        cmdline = "{0} {1}"
+        cmdline = cmdline.format(self.makecmd, self.makearg)
+        ok = self.runPhase(mod, "编译模块", cmdline, bldpath, stamp, 'make')
+        if compiled :
+            self.writeCacheStats(mod, bldpath)
+        if not ok :
+            return False
+
+        if self.artifacts is not None and not stamp.isDone('install') :
+            ok = self.installArtifact(mod, bldpath, stamp)
+        else :
+            cmdline = "{0} install"
+            cmdline = cmdline.format(self.makecmd)
+            ok = self.runPhase(mod, "安装模块", cmdline, bldpath,
+                               stamp, 'install')
+        if not ok :
+            return False
+
+        self.recordQtBase(mod)
+        self.installExamples(mod)
+        return True
+    def reuseQtBase  (self, mod) :
+        # 安装路径中的qtbase是用同样的源码和参数编译的, 并且qmake报告的
+        # 安装路径和版本也相同时, 不再配置, 编译和安装qtbase
+        record = readRecord(self.dstpath)
+        if record is None or \
+           record.get('key') != self.moduleKeys(mod)['installed'] :
+            return False
+        info = queryQmake(qmakePath(self.dstpath), self.buildenv)
+        if info is None or \
+           not samePath(info.get('QT_INSTALL_PREFIX'), self.dstpath) :
+            return False
+        version = sourceVersion(self.srcpath)
+        if version is not None and info.get('QT_VERSION') != version :
+            return False
+        self.reused.add(mod.name)
+        self.ui.writeBrief("{0} 安装路径中已有同样的源码和参数编译的qtbase"
+                           "(QT {1}), 跳过配置, 编译和安装\n",
+                           self.moduleTag(mod),
+                           info.get('QT_VERSION', '?'))
+        return True
+    def recordQtBase (self, mod, docs = False) :
+        # 在安装路径中记录qtbase的编译参数摘要, 下次编译时可以直接使用
+        if mod.type != ModuleType.QTBASE :
+            return
+        key    = self.moduleKeys(mod)['installed']
+        record = readRecord(self.dstpath) or {}
+        if record.get('key') != key :
+            record = {'key': key, 'docs': False}
+        record['version'] = sourceVersion(self.srcpath)
+        record['docs'   ] = record['docs'] or docs
+        try :
+            writeRecord(self.dstpath, record)
+        except OSError :
+            self.writeModDetail(mod, str(sys.exc_info()) + "\n")
+    def configureCmd (self, mod) :
+        if mod.type == ModuleType.QTBASE :
+            cmdline = "{0}/qtbase/configure -prefix {1} {2} {3}"
+            cmdline = cmdline.format(self.srcpath,
+                                     self.dstpath,
+                                     self.confarg,
+                                     self.cacheArgs())
+        else:
+            cmdline = "{0}/bin/qmake {1}/{2} {3}"
+            cmdline = cmdline.format(self.dstpath, 
+                                     self.srcpath, 
+                                     mod.name   ,
+                                     self.cacheArgs())
+        return cmdline.rstrip()
+    def restoreArtifact(self, mod, stamp) :
+        # 产物缓存中有这个模块时直接恢复安装的文件, 不配置和编译
+        if self.artifacts is None or stamp.isDone('install') :
+            return False
+        title = "从产物缓存恢复"
+        if stamp.isDone('restore') :
+            # 已经恢复过同样的产物, 不再重写安装路径中的文件
+            self.skipPhase(mod, title)
+            return True
+        key = self.moduleKeys(mod)['artifact']
+        if self.artifacts.lookup(key) is None :
+            return False
+        self.beginPhase(mod, title)
+        start = self.trace.now()
+        try :
+            count = self.artifacts.restore(key, self.dstpath)
+        except :
+            count = None
+            self.writeModDetail(mod, str(sys.exc_info()) + "\n")
+        self.trace.addSpan("{0} {1}".format(mod.name, title), 'phase', start,
+                           module = mod.name,
+                           phase  = 'restore',
+                           files  = count)
+        self.endPhase(mod, title, count is not None)
+        if count is None :
+            # 不能恢复(例如新的安装路径太长)时正常编译
+            return False
+        stamp.markDone('restore')
+        self.restored.add(mod.name)
+        return True
+    def installArtifact(self, mod, bldpath, stamp) :
+        # 先安装到临时目录(INSTALL_ROOT)中, 复制到安装路径以后保存到
+        # 产物缓存. 保存失败不影响编译
+        stage  = os.path.join(bldpath, '.install-root')
+        staged = os.path.join(stage, os.path.splitdrive(self.dstpath)[1]
+                                       .lstrip('/\\'))
+        if not self.journal.isDone(mod.name, 'install',
+                                   self.phaseKey(mod, 'install')) and \
+           os.path.lexists(stage) :
+            shutil.rmtree(stage)
+        cmdline = "{0} install INSTALL_ROOT={1}"
+        cmdline = cmdline.format(self.makecmd, stage)
+        if not self.runPhase(mod, "安装模块", cmdline, bldpath,
+                             phase = 'install') :
+            return False
+        try :
+            if os.path.isdir(staged) :
+                installTree(staged, self.dstpath)
+        except :
+            self.ui.writeBrief("{0} 安装模块失败\n", self.moduleTag(mod))
+            self.writeModDetail(mod, str(sys.exc_info()) + "\n")
+            return False
+        stamp.markDone('install')
+
+        title = "保存到产物缓存"
+        self.beginPhase(mod, title)
+        try :
+            self.artifacts.store(self.moduleKeys(mod)['artifact'],
+                                 staged,
+                                 self.dstpath,
+                                 mod.name)
+            self.stored.add(mod.name)
+            shutil.rmtree(stage)
+        except :
+            self.writeModDetail(mod, str(sys.exc_info()) + "\n")
+        self.endPhase(mod, title, mod.name in self.stored)
+        return True
+    def installExamples(self, mod) :
+        # 没有变化的示例文件会被跳过, 所以每次都可以安装
+        src = "{0}/{1}/examples"
+        src = src.format(self.srcpath, mod.name)
+        dst = "{0}/examples"
+        dst = dst.format(self.dstpath)
+        if not os.path.exists(src) :
+            return
+
+        self.exmtasks.append((mod, self.examples.install(src, dst)))
+    def waitExamples(self) :
+        # 后台任务的结果在全部模块编译完成后统一输出, 以免打断其他模块的输出
+        if not self.exmtasks :
+            return True
+        self.ui.writeBrief("等待示例安装完成......\n")
+        self.examples.wait()
+        retcode = True
+        for mod, future in self.exmtasks :
+            tag = self.moduleTag(mod)
+            try :
+                copied, skipped = future.result()
+            except Exception :
+                retcode = False
+                self.ui.writeBrief("{0} 安装示例失败\n", tag)
+                self.ui.writeDetail(str(sys.exc_info()) + "\n")
+                continue
+            self.ui.writeBrief("{0} 安装示例成功(复制 {1} 个文件, "
+                               "{2} 个文件无变化)\n",
+                               tag,
+                               copied,
+                               skipped)
+        return retcode
+    def docDeps      (self, mod) :
+        # 文档在模块安装以后生成, 并且需要依赖模块的文档(索引文件). 
+        # 如果qttools也在编译列表中, 还要等待它安装好qdoc
+        names = set(it.name for it in self.modlist)
+        deps  = [mod.name]
+        deps += [it + ':docs' for it in mod.dependence if it in names]
+        if 'qttools' in names and mod.name != 'qttools' :
+            deps.append('qttools')
+        return deps
+    def buildDoc     (self, mod) :
+        bldpath = os.path.join(self.bldroot, mod.name)
+        stamp   = BuildStamp(bldpath, self.moduleKeys(mod))
+        if stamp.isDone('docs') :
+            self.skipPhase(mod, "生成文档")
+            return True
+        if mod.name in self.reused and \
+           (readRecord(self.dstpath) or {}).get('docs') :
+            self.skipPhase(mod, "生成文档", "已经安装")
+            return True
+        if (stamp.isDone('restore') or mod.name in self.reused) and \
+           not self.runPhase(mod, "配置模块", self.configureCmd(mod), bldpath,
+                             stamp, 'configure') :
+            # 从产物缓存恢复或者直接使用的模块没有配置过, 生成文档之前先配置
+            return False
+
+        cmdline = "{0} docs"
+        cmdline = cmdline.format(self.makecmd)
+        if not self.runPhase(mod, "生成文档", cmdline, bldpath,
+                             phase = 'docs') :
+            return False
+
+        cmdline = "{0} install_docs"
+        cmdline = cmdline.format(self.makecmd)
+        if not self.runPhase(mod, "安装文档", cmdline, bldpath,
+                             phase = 'install_docs') :
+            return False
+        stamp.markDone('docs')
+        self.recordQtBase(mod, docs = True)
+        return True
+    def runPhase     (self, mod, title, cmd, cwd, 
+                      stamp = None, phase = None) :
+        # 构建戳记录的阶段以构建戳为准, 构建日志只用于其他阶段(文档等).
+        # 两者都只在摘要没有变化时跳过
+        if stamp is not None :
+            if stamp.isDone(phase) :
+                self.skipPhase(mod, title)
+                return True
+        elif phase is not None and \
+             self.journal.isDone(mod.name, phase, self.phaseKey(mod, phase)) :
+            self.skipPhase(mod, title, "上次已完成")
+            return True
+
+        # 编译阶段因为内存等资源耗尽而失败时, 减少同时编译的任务数后重试,
+        # 不重新配置模块
+        attempt = 0
+        jobs    = 0
+        entry   = None
+        while True :
+            mark = self.diagindex.exhausted[(mod.name, phase)]
+            code = self.execPhase(mod, title, cmd, cwd, phase, jobs)
+            if code == 0 or phase != 'make' or attempt >= self.retries :
+                break
+            if not self.isExhausted(mod, phase, code, mark) :
+                break
+            jobs = (jobs or self.makeJobs()) // 2
+            if jobs < 1 :
+                break
+            attempt += 1
+            cmd = "{0} -j{1}".format(stripJobs(cmd), jobs)
+            entry = [mod.name, title, jobs, False]
+            self.retried.append(entry)
+            self.ui.writeBrief("{0} 资源耗尽, 第 {1} 次重试: {2}\n",
+                               self.moduleTag(mod),
+                               attempt,
+                               cmd)
+        ok = code == 0
+        if entry is not None :
+            entry[3] = ok
+        if not ok :
+            self.writeFirstError(mod)
+
+        if ok and stamp is not None :
+            stamp.markDone(phase)
+        if ok and phase is not None :
+            self.journal.record(mod.name, phase, self.phaseKey(mod, phase))
+        return ok
+    def execPhase    (self, mod, title, cmd, cwd, phase, jobs = 0) :
+        """ 执行一个阶段的命令, jobs不为0时命令中指定了make的任务数 """
+        self.beginPhase(mod, title)
+        env    = self.moduleEnv(mod)
+        tokens = []
+        if self.jobserver is not None and phase in MAKE_PHASES :
+            # make自己的隐含名额也从jobserver中取得. 指定了任务数时不使用
+            # jobserver, 事先取得全部名额; 同时只有一个线程取得多个名额, 
+            # 以免互相等待
+            if jobs :
+                with self.tokenlock :
+                    tokens = [self.jobserver.acquire() for i in range(jobs)]
+            else :
+                tokens = [self.jobserver.acquire()]
+                self.jobserver.makeEnv(env)
+        start = self.trace.now()
+        try :
+            code, utime, stime = self.runCommand(cmd, cwd, env, mod, phase)
+        finally :
+            for it in tokens :
+                self.jobserver.release(it)
+        self.trace.addSpan("{0} {1}".format(mod.name, title), 'phase', start,
+                           module   = mod.name,
+                           phase    = phase,
+                           command  = cmd,
+                           exitcode = code,
+                           cpu_user = utime,
+                           cpu_sys  = stime)
+        self.endPhase  (mod, title, code == 0)
+        return code
+    def isExhausted  (self, mod, phase, code, mark) :
+        # 被SIGKILL杀掉(shell返回137), 或者输出中有资源耗尽的信息
+        if code in (-9, 137) :
+            return True
+        return self.diagindex.exhausted[(mod.name, phase)] > mark
+    def makeJobs     (self) :
+        """ 编译阶段当前使用的任务数, 不支持-jN的make返回0 """
+        if not isGnuMake(self.makecmd) :
+            return 0
+        if self.jobserver is not None :
+            return self.makejobs
+        match = re.search(r'(?:^|\s)(?:-j\s*|--jobs=)(\d+)', self.makearg)
+        return int(match.group(1)) if match else 1
+    def skipPhase    (self, mod, title, reason = "无变化") :
+        if self.serial :
+            self.ui.writeBrief("{0}......{1}, 跳过\n", title, reason)
+        else :
+            self.ui.writeBrief("{0} {1}......{2}, 跳过\n",
+                               self.moduleTag(mod),
+                               title,
+                               reason)
+    def beginPhase   (self, mod, title) :
+        # 同时编译多个模块时, 每条信息必须是完整的一行, 否则会和其他模块的
+        # 信息交错在一起
+        if self.serial :
+            self.ui.writeBrief("{0}......", title)
+        else :
+            self.ui.writeBrief("{0} {1}......\n", self.moduleTag(mod), title)
+    def endPhase     (self, mod, title, ok) :
+        result = "成功" if ok else "失败"
+        if self.serial :
+            self.ui.writeBrief("{0}\n", result)
+        else :
+            self.ui.writeBrief("{0} {1}{2}\n",
+                               self.moduleTag(mod),
+                               title,
+                               result)
+    def moduleTag    (self, mod) :
+        index = self.modlist.index(mod) + 1
+        return "[{0:02d} of {1:02d}] {2}".format(index,
+                                                len(self.modlist),
+                                                mod.name)
+    def writeModDetail(self, mod, text) :
+        if not self.serial and mod is not None :
+            prefix = "[{0}] ".format(mod.name)
+            text   = "".join(prefix + it 
+                             for it in text.splitlines(True))
+        self.ui.writeDetail(text)
+    def writeCacheStats(self, mod, bldpath) :
+        stats = self.compilerCache.readStats(bldpath)
+        if stats is None :
+            self.ui.writeBrief("{0} 编译缓存: 没有统计数据(需要ccache 4.x)\n",
+                               self.moduleTag(mod))
+            return
+        self.cachestats[mod.name] = stats
+        self.ui.writeBrief("{0} 编译缓存: 命中 {1} 次, 未命中 {2} 次, "
+                           "命中率 {3:.1f}%\n",
+                           self.moduleTag(mod),
+                           stats[0],
+                           stats[1],
+                           hitRate(*stats))
+    def writeCacheSummary(self) :
+        if not self.cachestats :
+            return
+        hits   = sum(it[0] for it in self.cachestats.values())
+        misses = sum(it[1] for it in self.cachestats.values())
+        self.ui.writeBrief("\n编译缓存: 共命中 {0} 次, 未命中 {1} 次, "
+                           "命中率 {2:.1f}%\n",
+                           hits,
+                           misses,
+                           hitRate(hits, misses))
+    def writeArtifactSummary(self) :
+        if self.artifacts is None :
+            return
+        self.ui.writeBrief("\n产物缓存({0}): 恢复 {1} 个模块, 保存 {2} 个模块\n",
+                           self.artifactdir,
+                           len(self.restored),
+                           len(self.stored))
+    def writeFirstError(self, mod) :
+        # 从诊断信息索引中找到模块的第一个错误, 直接读取日志中的那一行
+        diag = self.diagindex.firstError(mod.name)
+        if diag is None :
+            return
+        try :
+            path = os.path.join(self.logpath, 
+                                streamName(diag.module, diag.phase))
+            line = readLogLine(path, diag.offset)
+        except :
+            return
+        self.ui.writeBrief("{0} 第一个错误(日志偏移 {1}):\n    {2}\n",
+                           self.moduleTag(mod),
+                           diag.offset,
+                           line)
+    def writeDiagSummary(self) :
+        index = self.diagindex
+        names = [it.name for it in self.modlist 
+                 if index.warnings[it.name] or index.errors[it.name]]
+        if not names :
+            return
+        self.ui.writeBrief("\n编译警告和错误(位置索引: {0}):\n", index.path)
+        for it in names :
+            self.ui.writeBrief("    {0:<24} 警告 {1:>6}  错误 {2:>4}\n",
+                               it,
+                               index.warnings[it],
+                               index.errors[it])
+    def writeThrottleSummary(self) :
+        if self.throttle is None or not self.throttle.events :
+            return
+        self.ui.writeBrief("\n可用内存不足, 共调整编译任务 {0} 次, 详见 {1}\n",
+                           self.throttle.events,
+                           os.path.join(self.logpath, 
+                                        streamName(None, 'throttle')))
+    def writeRetrySummary(self) :
+        if not self.retried :
+            return
+        self.ui.writeBrief("\n资源耗尽后重试:\n")
+        for name, title, jobs, ok in self.retried :
+            self.ui.writeBrief("    {0:<24} {1} -j{2} {3}\n",
+                               name,
+                               title,
+                               jobs,
+                               "成功" if ok else "失败")
+    def writeSkipped (self, task, causes) :
+        # 依赖的模块失败以后, 依赖它的模块和文档立即被跳过
+        name, _, docs = task.name.partition(':')
+        mod  = self.modlist[[it.name for it in self.modlist].index(name)]
+        if not docs :
+            self.progress.finishModule(name, False)
+        if causes == [name] :
+            self.ui.writeBrief("{0} 模块编译失败, 不生成文档\n",
+                               self.moduleTag(mod))
+            return
+        what = "不生成文档" if docs else "跳过编译"
+        self.ui.writeBrief("{0} 依赖的 {1} 失败, {2}\n",
+                           self.moduleTag(mod),
+                           ", ".join(it.partition(':')[0] for it in causes),
+                           what)
+    def writeFailSummary(self, sched) :
+        # 失败的根源, 以及因为它们而被跳过的模块
+        failed = [it.name for it in sched.tasks
+                  if not sched.results.get(it.name, True)
+                  and it.name not in sched.causes]
+        if not failed :
+            return
+        self.ui.writeBrief("\n编译失败:\n")
+        for name in failed :
+            skipped = [it.name for it in sched.tasks
+                       if name in sched.causes.get(it.name, ())]
+            if name in sched.blocked :
+                self.ui.writeBrief("    {0} (循环依赖, 没有编译)\n", name)
+            else :
+                self.ui.writeBrief("    {0}\n", name)
+            if skipped :
+                self.ui.writeBrief("        因此跳过: {0}\n",
+                                   ", ".join(skipped))
+    def writeProfileSummary(self) :
+        if self.profiler is None :
+            return
+        # 结束时总会采样一次, 运行时间不到一个采样间隔的命令不列出
+        items = [it for it in self.profiler.summaries 
+                 if it['samples'] > 1 and it['module']]
+        if not items :
+            return
+        self.ui.writeBrief("\n资源使用(每 {0} 秒采样一次, 时间序列: {1}):\n"
+                           "    {2:<24} {3:<12} {4:>6} {5:>6} {6:>6} "
+                           "{7:>8} {8:>8} {9:>5} {10:>8} {11:>8}\n",
+                           self.profinterval,
+                           self.profiler.path,
+                           "模块", "阶段", "秒", "CPU", "峰值",
+                           "内存MB", "单进程MB", "进程", "读MB", "写MB")
+        for it in items :
+            self.ui.writeBrief("    {0:<24} {1:<12} {2:>6.0f} {3:>6.2f} "
+                               "{4:>6.2f} {5:>8} {6:>8} {7:>5} {8:>8} {9:>8}\n",
+                               it['module'],
+                               it['phase'],
+                               it['seconds'],
+                               it['cpu_avg'],
+                               it['cpu_peak'],
+                               it['rss_peak'] >> 20,
+                               it['rss_max'] >> 20,
+                               it['procs_peak'],
+                               it['read_bytes'] >> 20,
+                               it['write_bytes'] >> 20)
+    def writeTaskErrors(self, sched) :
+        for task in sched.tasks :
+            if task.error :
+                self.ui.writeBrief("{0} 发生异常\n", task.name)
+                self.ui.writeDetail(task.error)
+    def qtBuildThread(self) :
+        self.ui.onBuildStarted()
+        start = self.trace.now()
+
+        if self.modlist[0].type != ModuleType.QTBASE :
+            coremsg  = ('*** ' +
+                        '注意: QT基础框架(qtbase)不在'
+                        '编译列表中，请确认 '
+                        ' {0} 存在正确可用的QT基础框架'
+                        '*** '
+                        '\n\n')
+            self.ui.writeBrief(coremsg, self.dstpath)
+
+        while True :
+            self.retcode = False
+            if not self.setupBuildEnv() : 
+                break
+            if not self.scanSources  () :
+                break
+            if not self.buildQtMods  () :
+                break
+            self.retcode = True
+            break
+
+        self.trace.addSpan("编译QT", 'build', start, success = self.retcode)
+        self.clearBuildEnv()
+        self.ui.onBuildStopped()
+    def runCommand   (self, cmd, cwd = None, env = None, mod = None,
+                      phase = None) :
+        self.writeModDetail(mod, "{0}\n".format(cmd))
+        fds  = ()
+        if self.jobserver is not None and env and 'MAKEFLAGS' in env :
+            fds  = self.jobserver.passFds()
+        proc = subprocess.Popen(cmd,
+                                stdout  = subprocess.PIPE  ,
+                                stderr  = subprocess.STDOUT,
+                                shell   = True,
+                                cwd     = cwd,
+                                env     = env,
+                                bufsize = 0,
+                                pass_fds = fds)
+        watch   = None
+        if self.profiler is not None :
+            watch = self.profiler.watch(proc.pid, 
+                                        mod.name if mod else None,
+                                        phase)
+        scanner = None
+        if mod is not None and self.diagindex is not None :
+            scanner = self.diagindex.scanner(mod.name, phase)
+        if mod is not None and phase == 'make' and \
+           self.progress is not None and scanner is not None :
+            # 编译阶段的输出同时用于统计编译进度
+            scan  = scanner
+            count = self.progress.counter(mod.name)
+            def scanner(block, offset) :
+                scan (block, offset)
+                count(block, offset)
+        log = None
+        if self.logs is not None :
+            log = self.logs.open(mod.name if mod else None, phase)
+        pump = OutputPump(proc.stdout, log, scanner = scanner).start()
+        for text, offset in pump.chunks() :
+            self.writeModDetail(mod, text)
+        if log is not None :
+            self.logs.release(log)
+        if watch is not None :
+            self.profiler.unwatch(watch)
+        return waitProcess(proc)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+    编译缓存(ccache或者兼容的包装程序)
+"""
+import os
+
+"""
+    编译缓存：
+        把包装程序加在qtbase的configure和各个模块的qmake生成的编译命令
+        前面(由QT_CONFIGS中的 ccache 模板决定具体的参数), 并且通过
+        CCACHE_STATSLOG 让每个模块把自己的缓存统计写入shadow build目录,
+        这样同时编译多个模块时也可以得到每个模块的命中率(需要ccache 4.x).
+"""
+class CompilerCache :
+    STATSLOG = 'ccache-stats.log'
+    HITS     = ('direct_cache_hit', 'preprocessed_cache_hit')
+    MISSES   = ('cache_miss', )
+
+    def __init__(self, wrapper, template) :
+        self.wrapper  = wrapper
+        self.template = template
+
+    def qmakeArgs (self) :
+        return self.template.format(self.wrapper)
+    def moduleEnv (self, env, bldpath) :
+        env['CCACHE_STATSLOG'] = os.path.join(bldpath, 
+                                              CompilerCache.STATSLOG)
+        return env
+    def resetStats(self, bldpath) :
+        path = os.path.join(bldpath, CompilerCache.STATSLOG)
+        if os.path.exists(path) :
+            os.remove(path)
+    def readStats (self, bldpath) :
+        """ 返回 (命中次数, 未命中次数), 没有统计数据时返回None """
+        path = os.path.join(bldpath, CompilerCache.STATSLOG)
+        try :
+            f = open(path, 'rt', errors = 'replace')
+        except OSError :
+            return None
+        hits   = 0
+        misses = 0
+        with f :
+            for line in f :
+                line = line.strip()
+                if line in CompilerCache.HITS :
+                    hits   += 1
+                elif line in CompilerCache.MISSES :
+                    misses += 1
+        return hits, misses
+
+def hitRate(hits, misses) :
+    total = hits + misses
+    return 100.0 * hits / total if total else 0.0
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+    命令行界面与程序入口
+"""
+import sys
+import os
+import threading
+import time
+import shutil
+import argparse
+import unicodedata
+import collections
+
+from .modules import queryModuleList
+from .configs import QT_CONFIGS
+from .builder import QTBuilder
+from .script  import BuildScriptWriter
+from .diagnostics import loadIndex, firstErrors, readLogLine
+from .logpump import listBuilds, streamName
+
+
+"""
+    命令行界面：
+        提供与主窗口相同的选项, 不需要图形界面即可直接编译QT源码或者生成
+        编译脚本. 不带任何参数运行时启动图形界面.
+        编译进度(状态文本)在终端中显示在最后一行, 输出其他信息时先擦除,
+        然后重新显示; 输出不是终端时每隔 interval 秒输出一行.
+"""
+class ConsoleUi :
+    def __init__(self, verbose = False, stream = None, interval = 60) :
+        self.verbose  = verbose
+        self.stream   = stream or sys.stdout
+        self.lock     = threading.Lock()
+        self.isatty   = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.status   = ""
+        self.shown    = False
+        self.midline  = False
+        self.interval = interval
+        self.reported = 0
+
+    def output        (self, text, args, kwargs) :
+        if args or kwargs :
+            text = text.format(*args, **kwargs)
+        with self.lock :
+            if self.shown :
+                self.stream.write("\r\x1b[K")
+            self.stream.write(text)
+            self.midline = not text.endswith("\n")
+            self.shown   = bool(self.status) and not self.midline
+            if self.shown :
+                self.stream.write(self.status)
+            self.stream.flush()
+    def writeBrief    (self, text, *args, **kwargs) :
+        self.output(text, args, kwargs)
+    def writeDetail   (self, text, *args, **kwargs) :
+        if self.verbose :
+            self.output(text, args, kwargs)
+    def clearBrief    (self) :
+        pass
+    def clearDetail   (self) :
+        pass
+    def setStatusText (self, text) :
+        if not self.isatty :
+            now = time.monotonic()
+            if text and now - self.reported >= self.interval :
+                self.reported = now
+                self.output("[进度] {0}\n".format(text), (), {})
+            return
+        # 状态行不能超过终端的宽度, 否则折行以后无法擦除
+        width = shutil.get_terminal_size().columns - 1
+        text  = clipText(text, width)
+        with self.lock :
+            self.status = text
+            # 一行信息没有输出完时不显示状态行, 等这一行结束以后再显示
+            if self.midline :
+                return
+            self.stream.write("\r\x1b[K" + text)
+            self.stream.flush()
+            self.shown = bool(text)
+    def onBuildStarted(self) :
+        pass
+    def onBuildStopped(self) :
+        pass
+
+def clipText(text, width) :
+    # 中文等宽字符占两列
+    used = 0
+    for index, char in enumerate(text) :
+        used += 2 if unicodedata.east_asian_width(char) in 'WF' else 1
+        if used > width :
+            return text[:index]
+    return text
+def defaultConfigName() :
+    if sys.platform == "win32" :
+        return "winnt-mingw"
+    if sys.platform.startswith("linux") :
+        return "linux-g++"
+    return None
+# 值通常以"-"开头的选项(-j4, -opensource ...), argparse会把这样的值当作
+# 另一个选项, 解析之前把 "--make-args -j4" 合并为 "--make-args=-j4"
+DASH_VALUE_OPTIONS = ('--make-args', '--config-args')
+
+def joinDashValues  (argv) :
+    result = []
+    args   = iter(argv)
+    for arg in args :
+        if arg in DASH_VALUE_OPTIONS :
+            value = next(args, None)
+            if value is not None :
+                arg = "{0}={1}".format(arg, value)
+        result.append(arg)
+    return result
+def parseCommandLine (argv) :
+    parser = argparse.ArgumentParser(
+        prog        = "qt-builder",
+        description = "编译QT源码, 不带任何参数时启动图形界面")
+    parser.add_argument("-s", "--source", required = True,
+                        help = "源码位置")
+    parser.add_argument("-p", "--prefix",
+                        help = "安装位置")
+    parser.add_argument("--preset", choices = sorted(QT_CONFIGS),
+                        default = defaultConfigName(),
+                        help = "预设参数, 下面的选项可以覆盖其中的设置")
+    parser.add_argument("--make-cmd",
+                        help = "编译命令")
+    parser.add_argument("--make-args",
+                        help = "编译参数, 例如 --make-args \"-j4 -k\"")
+    parser.add_argument("--config-args",
+                        help = "配置参数, 例如 --config-args=\"-opensource "
+                               "-confirm-license\"")
+    parser.add_argument("--docs", dest = "makedoc", default = None,
+                        action = "store_true",
+                        help = "生成文档")
+    parser.add_argument("--no-docs", dest = "makedoc",
+                        action = "store_false",
+                        help = "不生成文档")
+    parser.add_argument("--skip-errors", dest = "skiperr", default = None,
+                        action = "store_true",
+                        help = "强制构建: 模块编译失败后继续编译其他模块")
+    parser.add_argument("--no-skip-errors", dest = "skiperr",
+                        action = "store_false",
+                        help = "模块编译失败后停止")
+    parser.add_argument("--ccache", nargs = "?", const = "ccache",
+                        metavar = "WRAPPER",
+                        help = "使用编译缓存(缺省为ccache), 并报告每个模块"
+                               "的缓存命中率")
+    parser.add_argument("-m", "--modules",
+                        help = "逗号分隔的模块列表, 缺省为推荐的模块")
+    parser.add_argument("-j", "--module-jobs", type = int, default = 1,
+                        help = "同时编译的模块数")
+    parser.add_argument("--make-jobs", type = int, default = 0,
+                        help = "所有make共享的编译任务数, 缺省为CPU数")
+    parser.add_argument("--no-jobserver", dest = "jobserver",
+                        action = "store_false",
+                        help = "不使用jobserver, 每个make使用make参数中的-jN")
+    parser.add_argument("--mem-low", type = int, default = 0,
+                        help = "可用内存低于此值(MB)时减少编译任务, "
+                               "缺省为总内存的10%%(至少1024)")
+    parser.add_argument("--no-mem-throttle", dest = "memthrottle",
+                        action = "store_false",
+                        help = "不根据可用内存调整编译任务")
+    parser.add_argument("--oom-retries", type = int, default = 2,
+                        help = "编译因为内存不足失败时, 减少任务数后重试的次数")
+    parser.add_argument("--profile-interval", type = float, default = 1.0,
+                        help = "每隔几秒采样一次编译命令进程树的资源使用"
+                               "(Linux), 0表示不采样")
+    parser.add_argument("--doc-jobs", type = int, default = 1,
+                        help = "同时生成文档的模块数")
+    parser.add_argument("--build-dir", default = "build",
+                        help = "shadow build目录")
+    parser.add_argument("--clean", action = "store_true",
+                        help = "清理重建: 删除上次的编译结果(保留logs中以前的日志)")
+    parser.add_argument("--resume", action = "store_true",
+                        help = "继续上次中断或者失败的编译, 已经完成的阶段"
+                               "不再执行(编译参数必须相同)")
+    parser.add_argument("--artifact-cache", metavar = "DIR", default = "",
+                        help = "产物缓存目录: 保存每个模块安装的文件, 源码和"
+                               "参数相同时直接恢复, 不再编译")
+    parser.add_argument("--artifact-cap", type = int, default = 8192,
+                        help = "产物缓存的大小上限(MB), 超过时删除最久没有"
+                               "使用的模块")
+    parser.add_argument("--link-examples", action = "store_true",
+                        help = "尽量使用硬链接安装示例代码")
+    parser.add_argument("--log-keep", type = int, default = 10,
+                        help = "保留最近几次编译的日志")
+    parser.add_argument("--log-cap", type = int, default = 512,
+                        help = "所有编译日志的总大小上限(MB)")
+    parser.add_argument("--export", metavar = "FILE",
+                        help = "只生成编译脚本(*.sh为shell脚本, "
+                               "否则为Makefile), 不进行编译")
+    parser.add_argument("--list-modules", action = "store_true",
+                        help = "列出源码中的模块后退出")
+    parser.add_argument("--errors", action = "store_true",
+                        help = "显示上次编译(--build-dir)中每个模块的第一个"
+                               "错误和警告数量后退出")
+    parser.add_argument("-v", "--verbose", action = "store_true",
+                        help = "输出详细信息")
+    return parser, parser.parse_args(joinDashValues(argv))
+def buildArgsFromCommandLine(parser, opts) :
+    modules = queryModuleList(opts.source)
+    if not modules :
+        parser.error("无效的源码路径: {0}".format(opts.source))
+    if not opts.prefix :
+        parser.error("无效的安装路径")
+
+    cfg = dict(QT_CONFIGS.get(opts.preset, {}))
+    for key, value in (('makecmd', opts.make_cmd   ),
+                       ('makearg', opts.make_args  ),
+                       ('confarg', opts.config_args),
+                       ('makedoc', opts.makedoc    ),
+                       ('skiperr', opts.skiperr    )) :
+        if value is not None :
+            cfg[key] = value
+    if not cfg.get('makecmd') :
+        parser.error("请输入编译命令")
+    if not cfg.get('confarg') :
+        parser.error("请输入编译参数")
+    if opts.ccache and not cfg.get('ccache') :
+        parser.error("预设参数 {0} 不支持编译缓存".format(opts.preset))
+    if opts.module_jobs < 1 :
+        parser.error("并行模块数必须是正整数")
+    if opts.make_jobs < 0 :
+        parser.error("编译任务数不能是负数")
+    if opts.doc_jobs < 1 :
+        parser.error("并行文档数必须是正整数")
+    if opts.resume and opts.clean :
+        parser.error("--resume 不能与 --clean 同时使用")
+
+    if opts.modules :
+        names   = [it.strip() for it in opts.modules.split(',') if it.strip()]
+        known   = [it.name for it in modules]
+        unknown = [it for it in names if it not in known]
+        if unknown :
+            parser.error("源码中没有这些模块: {0}".format(", ".join(unknown)))
+        modlist = [it for it in modules if it.name in names]
+    else :
+        modlist = [it for it in modules if it.selected]
+
+    return {
+        'srcpath' : os.path.abspath(opts.source),
+        'dstpath' : os.path.abspath(opts.prefix),
+        'confarg' : cfg['confarg'],
+        'makecmd' : cfg['makecmd'],
+        'makearg' : cfg.get('makearg', ''),
+        'makedoc' : int(bool(cfg.get('makedoc', 0))),
+        'skiperr' : int(bool(cfg.get('skiperr', 0))),
+        'modjobs' : opts.module_jobs,
+        'docjobs' : opts.doc_jobs,
+        'makejobs': opts.make_jobs,
+        'jobserver': opts.jobserver,
+        'memlow'  : opts.mem_low,
+        'memthrottle': opts.memthrottle,
+        'retries' : opts.oom_retries,
+        'profile' : opts.profile_interval,
+        'bldpath' : opts.build_dir,
+        'cleanbld': opts.clean,
+        'resume'  : opts.resume,
+        'artifacts': opts.artifact_cache and \
+                     os.path.abspath(opts.artifact_cache),
+        'artifactcap': opts.artifact_cap,
+        'exmlink' : opts.link_examples,
+        'logkeep' : opts.log_keep,
+        'logcap'  : opts.log_cap,
+        'ccache'  : opts.ccache or '',
+        'ccachearg': cfg.get('ccache', ''),
+        'modlist' : modlist
+    }
+def runConsole      (argv) :
+    parser, opts = parseCommandLine(argv)
+    if opts.list_modules :
+        for it in queryModuleList(opts.source) :
+            mark = '*' if it.selected else ' '
+            print("{0} {1:<20} {2}  {3}".format(mark, 
+                                                it.name, 
+                                                str(it.type),
+                                                it.description))
+        return 0
+    if opts.errors :
+        return showDiagnostics(opts.build_dir)
+
+    args = buildArgsFromCommandLine(parser, opts)
+    if opts.export :
+        BuildScriptWriter(**args).write(opts.export)
+        print("编译脚本已保存到 {0}".format(opts.export))
+        return 0
+
+    ui      = ConsoleUi(opts.verbose)
+    builder = QTBuilder(ui)
+    builder.buildQt(**args)
+    builder.worker.join()
+    if not builder.retcode :
+        ui.writeBrief("\n编译QT时发生错误, 详细信息请查看 {0}\n", 
+                      builder.logpath)
+        return 1
+    ui.writeBrief("\nQTSDK已经成功编译并安装\n")
+    return 0
+def showDiagnostics (bldpath) :
+    # 只读取诊断信息索引和日志中对应的行, 不扫描整个日志
+    builds   = listBuilds(os.path.join(bldpath, 'logs'))
+    logpath  = builds[-1] if builds else bldpath
+    diagpath = os.path.join(logpath, 'qt-build.diag')
+    try :
+        items = loadIndex(diagpath)
+    except OSError :
+        print("没有找到上次编译的诊断信息: {0}".format(diagpath))
+        return 1
+
+    warnings = collections.Counter(it.module for it in items 
+                                   if it.severity == 'warning')
+    for module, count in warnings.items() :
+        print("{0:<24} 警告 {1:>6}".format(module, count))
+    for module, diag in firstErrors(items).items() :
+        print("\n{0} {1} 第一个错误(日志偏移 {2}) {3}".format(module,
+                                                         diag.phase,
+                                                         diag.offset,
+                                                         diag.location))
+        path = os.path.join(logpath, streamName(diag.module, diag.phase))
+        print("    " + readLogLine(path, diag.offset))
+    return 0
+def main            (argv = None) :
+    if argv is None :
+        argv = sys.argv
+    if len(argv) > 1 :
+        return runConsole(argv[1:])
+    # 图形界面只在需要时才导入, 命令行和库的使用者不需要tkinter
+    from .gui import runGui
+    return runGui()
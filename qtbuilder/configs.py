@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+    预设的编译参数
+        ccache: 使用编译缓存时附加到configure和qmake命令行上的参数, {0}为
+                编译缓存的包装程序. 没有这一项的配置不支持编译缓存.
+                configure 接受 QMAKE_CC=... 形式的参数需要QT 5.9或者以上
+                的版本, 所以 winxp-mingw(QT 5.7.1或者以下)不支持
+"""
+
+QT_CONFIGS = {
+    'winnt-mingw': {
+        'confarg': '-opensource -confirm-license -nomake examples '
+                   '-opengl desktop '
+                   '-plugin-sql-odbc -silent ',
+        'makecmd': 'mingw32-make',
+        'makearg': '-j4',
+        'makedoc': 1,
+        'skiperr': 0,
+        'ccache' : 'QMAKE_CC="{0} gcc" QMAKE_CXX="{0} g++"',
+        'message': ''
+    },
+    'winnt-msvc' : {
+        'confarg': '-opensource -confirm-license -nomake examples '
+                   '-opengl desktop '
+                   '-plugin-sql-odbc -silent -mp ',
+        'makecmd': 'nmake',
+        'makedoc': 1,
+        'skiperr': 0,
+        'makearg': '',
+        'message': ''
+    },
+    'winxp-mingw': {
+        'confarg': '-opensource -confirm-license -nomake examples '
+                   '-opengl desktop '
+                   '-plugin-sql-odbc -no-angle ',
+        'makecmd': 'mingw32-make',
+        'makedoc': 1,
+        'skiperr': 1,
+        'makearg': '-j4',
+        'message': 'Windows XP上只能使用QT 5.7.1或者以下的版本'
+    },
+    'linux-g++'  : {
+        'confarg': '-opensource -confirm-license -nomake examples '
+                   '-opengl desktop -static'
+                   '-silent -qt-xcb -fontconfig ',
+        'makecmd': 'make',
+        'makedoc': 1,
+        'skiperr': 0,
+        'makearg': '-j4',
+        'ccache' : 'QMAKE_CC="{0} gcc" QMAKE_CXX="{0} g++"',
+        'message': '在Linux上使用缺省配置编译QT，请确认以下支持库已被安装：\n'
+                   '    * mesa-common-dev    \n'
+                   '    * libgl1-mesa-dev    \n'
+                   '    * libglu1-mesa-dev   \n'
+                   '    * freeglut3-dev      \n'
+                   '    * libfontconfig1-dev   '
+    }
+}
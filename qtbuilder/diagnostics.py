@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+    编译输出中错误和警告的索引
+"""
+import re
+import locale
+import threading
+import collections
+
+from .logpump import readLogData
+
+Diagnostic = collections.namedtuple('Diagnostic',
+                                    'module phase offset severity location')
+
+"""
+    编译器和构建工具的诊断信息格式, 每个表达式在一块输出中按行匹配.
+    severity 组是"error"/"warning"(不区分大小写), loc 组是 文件:行号.
+    Windows上的文件名可能以盘符开头(例如 C:/Qt/..., 也可能使用反斜杠)
+"""
+PATTERNS = [
+    # gcc/clang: file.cpp:12:5: error: ...  / fatal error: / warning:
+    br'^(?P<loc>(?:[A-Za-z]:)?[^\s:][^:\r\n]*:\d+(?::\d+)?): (?:fatal )?'
+    br'(?P<severity>error|warning):',
+    # MSVC: file.cpp(12) : error C2065: ...  / file.cpp(12,5): warning C4100
+    br'^\s*(?P<loc>[^\r\n(]+\(\d+(?:,\d+)?\)) ?: (?:fatal )?'
+    br'(?P<severity>error|warning) [A-Z]+\d+',
+    # MSVC链接器: foo.obj : error LNK2019 / LINK : fatal error LNK1104
+    br'^(?P<loc>(?:[A-Za-z]:)?[^\s:][^:\r\n]*?) : (?:fatal )?'
+    br'(?P<severity>error|warning) (?:LNK|LINK|RC|CVT)\d+',
+    # 链接器和编译器驱动: collect2: error: / ld: warning: / g++: fatal error:
+    br'^(?P<loc>(?:(?:[A-Za-z]:)?[^\s:]*[/\\])?'
+    br'(?:collect2|ld|ld\.\w+|[\w.+-]*g\+\+|[\w.+-]*gcc|clang(?:\+\+)?|'
+    br'cc1plus))(?:\.exe)?: (?:fatal )?'
+    br'(?P<severity>error|warning):',
+    # gcc/ld: foo.cpp:(.text+0x1a): undefined reference to `...'
+    br'^(?P<loc>(?:[A-Za-z]:)?[^\s:][^:\r\n]*):\([^)\r\n]*\): '
+    br'(?P<severity>undefined) reference',
+    # qmake和configure: Project ERROR: ... / ERROR: ... / WARNING: ...
+    br'^(?:Project )?(?P<severity>ERROR|WARNING): ',
+    # make: make[2]: *** [Makefile:123: foo.o] Error 1
+    br'^(?:[\w.-]*make|nmake|jom)(?:\.exe)?(?:\[\d+\])?: '
+    br'(?P<severity>\*\*\*) ',
+]
+# 绝大多数行是编译命令, 先查找关键字, 只对包含关键字的行进行完整的匹配
+# (编译选项 -Werror, -Wno-error=... 中的error不算)
+KEYWORDS = re.compile(br'error[: ]|warning[: ]|ERROR: |WARNING: |\*\*\* |'
+                      br'undefined ref')
+NONWORD  = frozenset(b' \t\r\n:,.\'"(')
+# 内存等资源耗尽造成的失败(编译器被OOM killer杀掉或者申请内存失败)
+EXHAUSTED = re.compile(br'Killed signal terminated program|'
+                       br'virtual memory exhausted|out of memory|'
+                       br'Cannot allocate memory|std::bad_alloc|'
+                       br'out of heap space|\] Killed\b|Error 137\b|'
+                       br'fatal error C1060|fatal error C1076|'
+                       br'fatal error C3859|fatal error LNK1102')
+
+def compilePatterns() :
+    # 各个表达式的组名必须不同, 合并成一个表达式以后一次扫描完成
+    parts = []
+    for index, it in enumerate(PATTERNS) :
+        for group in ('loc', 'severity') :
+            it = it.replace('(?P<{0}>'    .format(group       ).encode(),
+                            '(?P<{0}{1}>'.format(group, index).encode())
+        parts.append(b'(?:' + it + b')')
+    return re.compile(b'|'.join(parts), re.M)
+
+"""
+    诊断信息索引：
+        记录 (模块, 阶段, 日志偏移, 严重程度, 文件:行号), 同时追加写入
+        磁盘上的索引文件(每行一条, 以制表符分隔). 偏移是该行在这个模块
+        这个阶段的日志中的位置, 查看错误时直接定位, 不需要扫描全部日志.
+        每个模块的警告数量和第一个错误保存在内存中, exhausted 记录每个
+        模块的每个阶段输出了几次资源耗尽的信息. make报告的失败
+        (make: *** ...)只是错误的结果, 模块没有其他错误时才作为第一个错误.
+"""
+class DiagnosticIndex :
+    REGEX = None
+
+    def __init__(self, path) :
+        if DiagnosticIndex.REGEX is None :
+            DiagnosticIndex.REGEX = compilePatterns()
+        self.path     = path
+        self.file     = open(path, 'w', encoding = 'utf-8')
+        self.lock     = threading.Lock()
+        self.warnings = collections.Counter()
+        self.errors   = collections.Counter()
+        self.first    = {}
+        self.failed   = {}
+        self.exhausted = collections.Counter()
+
+    def scanner (self, module, phase) :
+        """ 返回一个函数, 用于扫描该模块该阶段输出的数据块 """
+        def scan(block, offset) :
+            self.scan(module, phase, block, offset)
+        return scan
+    def scan    (self, module, phase, block, offset) :
+        if EXHAUSTED.search(block) is not None :
+            with self.lock :
+                self.exhausted[(module, phase)] += 1
+        found = []
+        for match in self.matches(block) :
+            groups   = match.groupdict()
+            severity = b''
+            location = b''
+            for name, value in groups.items() :
+                if value is None :
+                    continue
+                if name.startswith('severity') :
+                    severity = value
+                elif name.startswith('loc') :
+                    location = value
+            severity = severity.lower()
+            if severity == b'warning' :
+                severity = 'warning'
+            elif severity == b'***' :
+                severity = 'failed'
+            else :
+                severity = 'error'
+            location = location.strip().decode('utf-8', 'replace')
+            found.append(Diagnostic(module,
+                                    phase,
+                                    offset + match.start(),
+                                    severity,
+                                    location))
+        if found :
+            self.add(found)
+    def matches (self, block) :
+        pos = 0
+        while True :
+            hit = KEYWORDS.search(block, pos)
+            if hit is None :
+                break
+            if hit.start() > 0 and block[hit.start() - 1] not in NONWORD :
+                pos = hit.end()
+                continue
+            start = block.rfind(b'\n', 0, hit.start()) + 1
+            end   = block.find (b'\n', hit.end())
+            if end < 0 :
+                end = len(block)
+            match = DiagnosticIndex.REGEX.match(block, start, end)
+            if match is not None :
+                yield match
+            pos = end + 1
+    def add     (self, items) :
+        with self.lock :
+            for it in items :
+                self.file.write("{0}\t{1}\t{2}\t{3}\t{4}\n".format(*it))
+                if it.severity == 'warning' :
+                    self.warnings[it.module] += 1
+                elif it.severity == 'failed' :
+                    self.failed.setdefault(it.module, it)
+                else :
+                    self.errors[it.module] += 1
+                    self.first.setdefault(it.module, it)
+    def firstError(self, module) :
+        with self.lock :
+            return self.first.get(module) or self.failed.get(module)
+    def close   (self) :
+        with self.lock :
+            self.file.close()
+
+def loadIndex(path) :
+    """ 读取索引文件, 返回Diagnostic列表 """
+    items = []
+    with open(path, encoding = 'utf-8') as file :
+        for line in file :
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) != 5 :
+                continue
+            fields[2] = int(fields[2])
+            items.append(Diagnostic(*fields))
+    return items
+
+def firstErrors(items) :
+    """ 每个模块的第一个错误, 按照模块出现的顺序 """
+    first  = collections.OrderedDict()
+    failed = {}
+    for it in items :
+        if it.severity == 'error' :
+            first.setdefault(it.module, it)
+        elif it.severity == 'failed' :
+            failed.setdefault(it.module, it)
+    for module, it in failed.items() :
+        first.setdefault(module, it)
+    return first
+def readLogLine(logpath, offset, maxlen = 400, encoding = None) :
+    """ 读取编译日志(可以是压缩的)中offset处的一行 """
+    encoding = encoding or locale.getpreferredencoding(False)
+    line = readLogData(logpath, offset, maxlen).split(b'\n', 1)[0]
+    return line.decode(encoding, 'replace').rstrip()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+    示例代码的安装
+"""
+import os
+import errno
+import shutil
+import concurrent.futures
+
+"""
+    示例安装器：
+        在后台把模块的examples目录安装到"安装路径"中, 不占用编译线程.
+        大小和修改时间与源文件相同的文件被跳过; 需要复制的文件分散到线程池
+        中, 优先使用copy_file_range(文件系统支持时直接共享数据块), 
+        hardlink为真时尽量使用硬链接. 复制以后目标文件的修改时间与源文件
+        相同, 下次安装时即可跳过.
+"""
+class ExampleInstaller :
+    def __init__(self, jobs = None, hardlink = False, trace = None) :
+        self.jobs     = jobs or min(8, (os.cpu_count() or 1) * 2)
+        self.hardlink = hardlink
+        self.trace    = trace
+        self.futures  = []
+        # 目录遍历任务要等待文件复制任务, 两者使用不同的线程池
+        self.walkers  = concurrent.futures.ThreadPoolExecutor(
+            2, thread_name_prefix = 'examples')
+        self.copiers  = concurrent.futures.ThreadPoolExecutor(
+            self.jobs, thread_name_prefix = 'copy')
+
+    def install    (self, src, dst) :
+        """ 
+            在后台安装src目录, 返回Future, 其结果为 (复制的文件数, 
+            跳过的文件数)
+        """
+        future = self.walkers.submit(self.installTree, src, dst)
+        self.futures.append(future)
+        return future
+    def wait       (self) :
+        concurrent.futures.wait(self.futures)
+    def shutdown   (self) :
+        self.walkers.shutdown()
+        self.copiers.shutdown()
+    def installTree(self, src, dst) :
+        if self.trace is not None :
+            start = self.trace.now()
+        futures = []
+        for root, dirs, files in os.walk(src) :
+            relpath = os.path.relpath(root, src)
+            dstdir  = os.path.normpath(os.path.join(dst, relpath))
+            os.makedirs(dstdir, exist_ok = True)
+            for file in files :
+                futures.append(self.copiers.submit(self.installFile,
+                                                   os.path.join(root  , file),
+                                                   os.path.join(dstdir, file)))
+        copied = 0
+        for it in futures :
+            if it.result() :
+                copied += 1
+        if self.trace is not None :
+            name = os.path.basename(os.path.dirname(os.path.abspath(src)))
+            self.trace.addSpan(name + " 安装示例", 'examples', start,
+                               source  = src,
+                               copied  = copied,
+                               skipped = len(futures) - copied)
+        return copied, len(futures) - copied
+    def installFile(self, srcpath, dstpath) :
+        st = os.stat(srcpath)
+        try :
+            dt = os.stat(dstpath)
+            if dt.st_size     == st.st_size     and \
+               dt.st_mtime_ns == st.st_mtime_ns :
+                return False
+            # 先删除旧文件, 以免通过硬链接改写了别的文件
+            os.remove(dstpath)
+        except FileNotFoundError :
+            pass
+
+        if self.hardlink :
+            try :
+                os.link(srcpath, dstpath)
+                return True
+            except OSError :
+                pass
+        fastCopy(srcpath, dstpath)
+        os.utime(dstpath, ns = (st.st_atime_ns, st.st_mtime_ns))
+        return True
+
+def fastCopy(src, dst) :
+    if hasattr(os, 'copy_file_range') :
+        try :
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst :
+                size   = os.fstat(fsrc.fileno()).st_size
+                copied = 0
+                while copied < size :
+                    count = os.copy_file_range(fsrc.fileno(), 
+                                               fdst.fileno(),
+                                               size - copied)
+                    if count == 0 :
+                        break
+                    copied += count
+            if copied == size :
+                return
+        except OSError as e :
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                               errno.EOPNOTSUPP, errno.EPERM) :
+                raise
+    shutil.copyfile(src, dst)
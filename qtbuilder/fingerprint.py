@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+    源码目录指纹
+"""
+import os
+import hashlib
+import collections
+import marshal
+import zlib
+import time
+import functools
+import concurrent.futures
+
+from .modules import queryModuleList
+
+
+"""
+    源码指纹引擎：
+        并行遍历各个模块的源码目录, 把每个文件的(路径, 大小, 修改时间, inode)
+        以及内容摘要保存在压缩的清单文件中. 再次扫描时只有stat信息发生了变化
+        的文件才会重新计算内容摘要, 模块指纹只由文件路径和内容摘要决定.
+        修改时间距离扫描开始不足 RACY_NS 的文件下次扫描时总是重新计算摘要,
+        以免在同一个时间精度内被再次修改而漏掉.
+"""
+Fingerprint = collections.namedtuple('Fingerprint', 'name digest files changed')
+
+class FingerprintEngine :
+    VERSION   = 1
+    SKIPDIRS  = ('.git', )
+    BLOCKSIZE = 1 << 20
+    RACY_NS   = 2 * 1000 * 1000 * 1000
+
+    def __init__(self, srcpath, cachedir, jobs = None) :
+        self.srcpath  = srcpath
+        self.cachedir = cachedir
+        self.jobs     = jobs or min(32, (os.cpu_count() or 1) * 4)
+
+    def scan        (self, names = None) :
+        """
+            扫描指定的模块(缺省为queryModuleList找到的所有模块), 
+            返回 {模块名称: Fingerprint}
+        """
+        if names is None :
+            names = [it.name for it in queryModuleList(self.srcpath)]
+        os.makedirs(self.cachedir, exist_ok = True)
+
+        # 模块任务只等待目录遍历和摘要计算任务, 两者使用不同的线程池,
+        # 避免线程池被正在等待的任务占满
+        result = {}
+        with concurrent.futures.ThreadPoolExecutor(self.jobs) as iopool, \
+             concurrent.futures.ThreadPoolExecutor(len(names) or 1) as pool :
+            futures = [pool.submit(self.scanModule, it, iopool) 
+                       for it in names]
+            for it in futures :
+                fp = it.result()
+                result[fp.name] = fp
+        return result
+    def scanModule  (self, name, pool = None) :
+        root    = os.path.join(self.srcpath, name)
+        started = time.time_ns()
+        old     = self.loadManifest(name)
+        stats   = self.walk(root, pool)
+
+        entries = {}
+        rehash  = []
+        for path, st in stats.items() :
+            prev = old.get(path)
+            if prev is not None and prev[:3] == st :
+                entries[path] = prev
+            else :
+                rehash.append(path)
+
+        hashfunc = functools.partial(self.hashFile, root)
+        if pool is not None :
+            digests = pool.map(hashfunc, rehash)
+        else :
+            digests = map(hashfunc, rehash)
+
+        changed = []
+        for path, digest in zip(rehash, digests) :
+            size, mtime, inode = stats[path]
+            if mtime >= started - FingerprintEngine.RACY_NS :
+                size = -1
+            entries[path] = (size, mtime, inode, digest)
+            prev = old.get(path)
+            if prev is None or prev[3] != digest :
+                changed.append(path)
+        changed.extend(it for it in old if it not in stats)
+        changed.sort()
+
+        digest = hashlib.blake2b(digest_size = 20)
+        for path in sorted(entries) :
+            digest.update(path.encode('utf-8', 'surrogateescape'))
+            digest.update(b'\0')
+            digest.update(entries[path][3])
+
+        if changed or len(entries) != len(old) or rehash :
+            self.saveManifest(name, entries)
+        return Fingerprint(name, digest.hexdigest(), len(entries), changed)
+    def walk        (self, root, pool = None) :
+        # 模块的顶层目录在当前线程扫描, 每个子目录作为一个独立的任务
+        stats = {}
+        dirs  = self.scanDir(root, '', stats)
+        if pool is None :
+            for it in dirs :
+                stats.update(self.walkTree(root, it))
+            return stats
+
+        futures = [pool.submit(self.walkTree, root, it) for it in dirs]
+        for it in futures :
+            stats.update(it.result())
+        return stats
+    def walkTree    (self, root, relpath) :
+        stats = {}
+        stack = [relpath]
+        while stack :
+            stack.extend(self.scanDir(root, stack.pop(), stats))
+        return stats
+    def scanDir     (self, root, relpath, stats) :
+        dirs = []
+        path = os.path.join(root, relpath) if relpath else root
+        try :
+            it = os.scandir(path)
+        except OSError :
+            return dirs
+        prefix = relpath + '/' if relpath else ''
+        with it :
+            for entry in it :
+                try :
+                    if entry.is_dir(follow_symlinks = False) :
+                        if entry.name not in FingerprintEngine.SKIPDIRS :
+                            dirs.append(prefix + entry.name)
+                        continue
+                    st = entry.stat(follow_symlinks = False)
+                except OSError :
+                    continue
+                stats[prefix + entry.name] = (st.st_size,
+                                              st.st_mtime_ns,
+                                              entry.inode())
+        return dirs
+    def hashFile    (self, root, relpath) :
+        path   = os.path.join(root, relpath)
+        digest = hashlib.blake2b(digest_size = 16)
+        try :
+            if os.path.islink(path) :
+                digest.update(os.readlink(path).encode('utf-8', 
+                                                       'surrogateescape'))
+                return digest.digest()
+            with open(path, 'rb') as f :
+                while True :
+                    block = f.read(FingerprintEngine.BLOCKSIZE)
+                    if not block :
+                        break
+                    digest.update(block)
+        except OSError :
+            return b''
+        return digest.digest()
+    def manifestPath(self, name) :
+        return os.path.join(self.cachedir, name + '.manifest')
+    def loadManifest(self, name) :
+        try :
+            with open(self.manifestPath(name), 'rb') as f :
+                data = marshal.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, EOFError, TypeError, zlib.error) :
+            return {}
+        if not isinstance(data, dict)                        or \
+           data.get('version') != FingerprintEngine.VERSION  or \
+           data.get('root'   ) != os.path.join(self.srcpath, name) :
+            return {}
+        return data['entries']
+    def saveManifest(self, name, entries) :
+        data = {
+            'version': FingerprintEngine.VERSION,
+            'root'   : os.path.join(self.srcpath, name),
+            'entries': entries
+        }
+        path = self.manifestPath(name)
+        temp = path + '.tmp'
+        with open(temp, 'wb') as f :
+            f.write(zlib.compress(marshal.dumps(data), 1))
+        os.replace(temp, path)
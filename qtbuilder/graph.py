@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+    模块依赖图: 传递闭包, 循环检测, 拓扑排序和关键路径
+"""
+import os
+import json
+import heapq
+
+from .logpump import listBuilds
+
+
+"""
+    模块依赖图：
+        mods 是模块列表(name, dependence, type), 依赖列表中不在图内的模块
+        被认为已经安装, 不参与排序. weights 是各模块预计的编译时间(秒),
+        没有记录的模块使用已知模块的平均值(都没有时为1).
+        critical[模块] 是从该模块开始, 沿着依赖它的模块一直到最后的最长
+        路径的预计时间(包括模块本身). 关键路径越长的模块越应该先编译,
+        否则后面的模块会等待它, 整个编译的时间就会变长.
+        order() 给出确定的拓扑顺序: 依赖的模块总是在前面, 同时可以编译的
+        模块按照 关键路径(长的在前), 模块类型, 名称 排序. 存在循环依赖时
+        从循环中按照同样的规则选出一个模块打破循环, 仍然给出完整的顺序.
+"""
+class ModuleGraph :
+    def __init__(self, mods, weights = None) :
+        self.mods  = list(mods)
+        self.index = dict((it.name, it) for it in self.mods)
+        self.deps  = {}
+        self.users = dict((it.name, []) for it in self.mods)
+        for it in self.mods :
+            deps = []
+            for dep in it.dependence :
+                if dep in self.index and dep != it.name and dep not in deps :
+                    deps.append(dep)
+                    self.users[dep].append(it.name)
+            self.deps[it.name] = deps
+
+        weights = dict((k, v) for k, v in (weights or {}).items()
+                       if k in self.index and v > 0)
+        average = sum(weights.values()) / len(weights) if weights else 1.0
+        self.weights  = dict((it.name, weights.get(it.name, average))
+                             for it in self.mods)
+        self.critical = self.criticalPaths()
+
+    def closure   (self, name) :
+        """ name直接或者间接依赖的所有模块 """
+        return self.reach(name, self.deps)
+    def dependents(self, name) :
+        """ 直接或者间接依赖name的所有模块 """
+        return self.reach(name, self.users)
+    def reach     (self, name, edges) :
+        found   = set()
+        pending = list(edges.get(name, ()))
+        while pending :
+            it = pending.pop()
+            if it in found :
+                continue
+            found.add(it)
+            pending.extend(edges[it])
+        found.discard(name)
+        return found
+    def findCycle (self) :
+        """ 返回一个循环依赖的模块列表(首尾相同), 没有循环时返回空列表 """
+        # 0: 未访问, 1: 正在访问, 2: 已完成
+        state = dict((it, 0) for it in self.index)
+        for root in sorted(self.index) :
+            if state[root] :
+                continue
+            path  = [root]
+            stack = [iter(self.deps[root])]
+            state[root] = 1
+            while stack :
+                dep = next(stack[-1], None)
+                if dep is None :
+                    state[path.pop()] = 2
+                    stack.pop()
+                elif state[dep] == 1 :
+                    return path[path.index(dep):] + [dep]
+                elif state[dep] == 0 :
+                    state[dep] = 1
+                    path.append(dep)
+                    stack.append(iter(self.deps[dep]))
+        return []
+    def criticalPaths(self) :
+        # 按照拓扑顺序的逆序计算, 循环中的边被忽略
+        paths = {}
+        for name in reversed(self.topoNames(lambda it : (it,))) :
+            longest = max([paths[it] for it in self.users[name] if it in paths]
+                          or [0.0])
+            paths[name] = self.weights[name] + longest
+        return paths
+    def sortKey   (self, name) :
+        return (-self.critical[name], int(self.index[name].type), name)
+    def order     (self) :
+        """ 按照拓扑顺序排列的模块列表 """
+        return [self.index[it] for it in self.topoNames(self.sortKey)]
+    def topoNames (self, key) :
+        count = dict((k, len(v)) for k, v in self.deps.items())
+        ready = [(key(k), k) for k, v in count.items() if not v]
+        left  = set(self.index)
+        names = []
+        heapq.heapify(ready)
+        while left :
+            if not ready :
+                # 剩下的模块都在循环中或者依赖循环, 选一个打破循环
+                name = min(left, key = key)
+                ready.append((key(name), name))
+            _, name = heapq.heappop(ready)
+            if name not in left :
+                continue
+            left.discard(name)
+            names.append(name)
+            for it in self.users[name] :
+                count[it] -= 1
+                if count[it] == 0 and it in left :
+                    heapq.heappush(ready, (key(it), it))
+        return names
+
+def estimateWeights(logroot) :
+    """
+        从以前的编译记录(日志目录中的 qt-build.trace.json)估计各模块的
+        编译时间(秒, 不包括文档). 每个模块使用它最近一次真正编译过
+        (执行了make)的记录
+    """
+    weights = {}
+    for path in reversed(listBuilds(logroot)) :
+        try :
+            with open(os.path.join(path, 'qt-build.trace.json')) as file :
+                events = json.load(file)['traceEvents']
+        except (OSError, ValueError, KeyError) :
+            continue
+        spans = {}
+        built = set()
+        for it in events :
+            args = it.get('args', {})
+            if it.get('cat') != 'phase' or 'module' not in args :
+                continue
+            if args.get('phase') in ('docs', 'install_docs') :
+                continue
+            module = args['module']
+            spans[module] = spans.get(module, 0.0) + it['dur'] / 1e6
+            if args.get('phase') == 'make' :
+                built.add(module)
+        for it in built :
+            weights.setdefault(it, spans[it])
+    return weights
@@ -0,0 +1,771 @@
+# -*- coding: utf-8 -*-
+"""
+    图形界面, 只在启动图形界面时才会被导入
+"""
+import tkinter.filedialog
+import tkinter.font
+import tkinter.messagebox
+import tkinter as tk
+
+import sys
+import os
+import platform
+import functools
+import re
+import queue
+import ctypes
+
+from .modules import ModuleType, queryModuleList
+from .configs import QT_CONFIGS
+from .builder import QTBuilder
+from .script  import BuildScriptWriter
+
+
+def centerWindow    (top ) :
+    top.update_idletasks()
+    x = (top.winfo_screenwidth () - top.winfo_reqwidth ()) // 2
+    y = 200
+    w = top.winfo_reqwidth ()
+    h = top.winfo_reqheight()
+    g = "{w}x{h}+{x}+{y}".format(x = x,
+                                 y = y,
+                                 w = w,
+                                 h = h)
+    top.geometry(g)
+def updateGeometry  (top ) :
+    r = "(\d+)x(\d+)[-+](\d+)[-+](\d+)"
+    m = re.match(r,top.geometry())
+    x = int(m.groups()[2])
+    y = int(m.groups()[3])
+
+    top.update_idletasks()
+    w = top.winfo_reqwidth ()
+    h = top.winfo_reqheight()
+    g = "{w}x{h}+{x}+{y}".format(x = x, 
+                                 y = y,
+                                 w = w, 
+                                 h = h)
+    top.geometry(g)
+def preventHibernate(top ) :
+    if platform.system() == "Windows" :
+        ctypes.windll.kernel32.SetThreadExecutionState(0x80000001)
+    top.after(10 * 1000, lambda: preventHibernate(top))
+
+class CfgArgsDlg(tk.Frame) :
+    def __init__(self, args = "", master = None) :
+        tk.Frame.__init__(self, master, relief = tk.FLAT)
+
+        toplevel = tk.Toplevel(self.master)
+        toplevel.title("修改配置参数")
+        toplevel.protocol("WM_DELETE_WINDOW", 
+                          self.onCancel)
+        toplevel.grab_set()
+
+        w = tk.Text (toplevel, width = 80, height = 20)
+        w.config(wrap = 'word')
+        w.insert('end',args)
+        w.focus_set()
+        w.grid(row        = 0,
+               column     = 0, 
+               columnspan = 5,
+               padx       = 4, 
+               pady       = 4)
+        self.textedit = w
+
+        w = tk.Button(toplevel, 
+                      command = self.onOk,
+                      width   = 8,
+                      text    = "确定")
+        w.grid(row    = 1, 
+               column = 1, 
+               pady   = 4)
+
+        w = tk.Button(toplevel, 
+                      command = self.onCancel,
+                      width   = 8,
+                      text    = "取消")
+        w.grid(row    = 1, 
+               column = 3,
+               pady   = 4)
+
+        self.toplevel = toplevel
+        self.cfgargs  = args
+        self.accepted = False
+
+        toplevel.resizable(False, False)
+    
+    def onCancel(self) :
+        self.accepted = False
+        self.cfgargs  = ""
+        self.toplevel.grab_release()
+        self.toplevel.destroy()
+    def onOk    (self) :
+        args = self.textedit.get("0.0", "end")
+        args = args.replace('\n', ' ')
+        args = args.replace('\t', ' ')
+        self.accepted = True
+        self.cfgargs  = args
+        self.toplevel.grab_release()
+        self.toplevel.destroy()
+    def doModal (self) :
+        self.toplevel.withdraw ()
+        updateGeometry(self.toplevel)
+        centerWindow  (self.toplevel)
+        self.toplevel.deiconify()
+        self.toplevel.wait_window()
+
+class ModuleView(tk.Frame) :
+    def __init__(self, path = "", master = None) :
+        tk.Frame.__init__(self, master, relief=tk.FLAT)
+
+        self.groupViews = {}
+        self.moduleList = queryModuleList(path)
+        for it in self.moduleList :
+            self.createModuleItem(it)
+
+        for it in list(ModuleType) :
+            if it not in self.groupViews:
+                continue
+            view = self.groupViews[it]
+            view.pack(fill = 'x')
+
+    def createModuleItem(self, info) :
+        if info.type not in self.groupViews :
+            self.createGroupView(info.type)
+
+        view = self.groupViews[info.type]
+        item = tk.Checkbutton(view, text = info.name)
+        item.modinfo = info
+        info.checked = tk.IntVar()
+        info.widget  = item
+        item.config(justify  = 'left',
+                    variable = info.checked)
+
+        def showDesc(e) :
+            desc = e.widget.modinfo.description
+            self.master.setStatusText(desc)
+        def hideDesc(e) :
+            self.master.setStatusText("")
+
+        item.bind("<Enter>", showDesc)
+        item.bind("<Leave>", hideDesc)
+
+        if info.selected : 
+            item.select()
+        
+        count = len(view.children.values()) - 1
+        row   = count // 3
+        col   = count %  3
+        item.grid(row    = row,
+                  column = col,
+                  sticky = 'W')
+    def createGroupView (self, type) :
+        view = tk.LabelFrame(self, text = str(type))
+        view.columnconfigure(0, minsize=150, weight = 1)
+        view.columnconfigure(1, minsize=150, weight = 1)
+        view.columnconfigure(2, minsize=150, weight = 1)
+
+        self.groupViews[type] = view
+    def selectModuleList(self) :
+        modList = []
+        for it in self.moduleList :
+            if it.checked.get() :
+                modList.append(it)
+        return modList
+
+"""
+    界面日志输出：
+        工作线程只把文本放入队列, 界面线程每隔 interval 毫秒取出一次, 把这段
+        时间内写入同一个文本框的所有文本合并成一次插入. 每个文本框最多保留
+        maxlines 行(0表示不限制), 超出的旧内容被删除, 完整的输出只保存在编译
+        日志中. 需要在界面线程中执行的其他操作也通过同一个队列按顺序完成.
+"""
+class UiLogSink :
+    def __init__(self, master, interval = 50) :
+        self.master   = master
+        self.interval = interval
+        self.queue    = queue.Queue()
+        self.views    = {}
+        self.master.after(self.interval, self.drain)
+
+    def addView  (self, name, view, maxlines = 0) :
+        self.views[name] = (view, maxlines)
+    def write    (self, name, text) :
+        self.queue.put((name, text))
+    def clear    (self, name) :
+        self.queue.put((name, None))
+    def call     (self, func, *args) :
+        self.queue.put((None, functools.partial(func, *args)))
+    def drain    (self) :
+        pending = {}
+        try :
+            while True :
+                try :
+                    name, data = self.queue.get_nowait()
+                except queue.Empty :
+                    break
+                if name is None :
+                    self.flush(pending)
+                    data()
+                elif data is None :
+                    pending.pop(name, None)
+                    self.clearView(name)
+                else :
+                    pending.setdefault(name, []).append(data)
+            self.flush(pending)
+        finally :
+            self.master.after(self.interval, self.drain)
+    def flush    (self, pending) :
+        for name, texts in pending.items() :
+            self.insertView(name, "".join(texts))
+        pending.clear()
+    def insertView(self, name, text) :
+        view, maxlines = self.views[name]
+        if maxlines and text.count('\n') > maxlines :
+            text = "".join(text.splitlines(True)[-maxlines:])
+
+        view.config(state = 'normal'  )
+        view.insert('end', text)
+        if maxlines :
+            count = int(view.index('end-1c').split('.')[0])
+            if count > maxlines :
+                view.delete('1.0', '{0}.0'.format(count - maxlines + 1))
+        view.see('end')
+        view.config(state = 'disabled')
+    def clearView(self, name) :
+        view, maxlines = self.views[name]
+        view.configure(state = 'normal'  )
+        view.delete('0.0', 'end')
+        view.see('end')
+        view.configure(state = 'disabled')
+
+class MainWindow(tk.Frame) :
+    def __init__(self,  master = None, detailLines = 5000) :
+        tk.Frame.__init__(self, master, relief = tk.FLAT)
+
+        welcome = "欢迎使用QT构建工具......"
+
+        self.sourcePath = tk.StringVar()
+        self.targetPath = tk.StringVar()
+        self.makeCmd    = tk.StringVar()
+        self.makeArgs   = tk.StringVar()
+        self.configArgs = tk.StringVar()
+        self.makeDoc    = tk.IntVar   (value = 1)
+        self.skipError  = tk.IntVar   (value = 1)
+        self.modJobs    = tk.IntVar   (value = 1)
+        self.cleanBuild = tk.IntVar   (value = 0)
+        self.useCcache  = tk.IntVar   (value = 0)
+        self.ccacheArg  = ''
+
+        self.showDetail = tk.IntVar   (value = 0)
+        self.moduleView = None
+        self.statusText = tk.StringVar(value = welcome)
+        self.detailView = self.createDetailPane()
+        self.uiSink     = UiLogSink(self)
+        self.uiSink.addView('brief' , self.detailView.brief )
+        self.uiSink.addView('detail', self.detailView.detail, detailLines)
+        self.optWidgets = []
+        self.qtBuilder  = QTBuilder(self)
+        
+        pane = self.createOptionPane()
+        pane.grid(row    = 0, 
+                  column = 0, 
+                  pady   = 4, 
+                  sticky = ("W","E"))
+        self.optionPane = pane
+
+        self.columnconfigure(0, weight = 10)
+
+        pane = self.createStatusPane()
+        pane.grid(row    = 2, 
+                  column = 0, 
+                  pady   = 0, 
+                  sticky = ("W","E"))
+        self.statusPane = pane
+
+    def onBrowseSourcePath(self) :
+        path = tk.filedialog.askdirectory()
+        if not path :
+            return
+        if not self.setQtSourcePath(path) :
+            return
+        self.sourcePath.set(path)
+    def onBrowseTargetPath(self) :
+        path = tk.filedialog.askdirectory()
+        if not path : 
+            return
+        self.targetPath.set (path)
+    def onChangeSourcePath(self) :
+        path = self.sourcePath.get()
+        self.setQtSourcePath(path)        
+    def onChangeConfigArgs(self) :
+        dlg = CfgArgsDlg(self.configArgs.get(), self)
+        dlg.doModal()
+        if dlg.accepted:
+            self.configArgs.set(dlg.cfgargs)
+        updateGeometry(self.master)
+    def onShowDetailWindow(self) :
+        top = self.detailView.master
+        if  self.showDetail.get() :
+            self.updateDetailWindow()
+            top.deiconify()
+        else:
+            top.withdraw ()
+    def onHideDetailWindow(self) :
+        top = self.detailView.master
+        top.withdraw ()
+        self.showDetail.set(0)
+    def onBuildQt         (self, resume = False) :
+        if not self.checkUserInput() :
+            return
+        self.showDetail.set(1)
+        self.qtBuilder.buildQt(resume = resume, **self.buildArgs())
+    def onResumeBuild     (self) :
+        self.onBuildQt(resume = True)
+    def onSaveBuildScript (self) :
+        if not self.checkUserInput() :
+            return
+        path = tk.filedialog.asksaveasfilename(
+            initialfile = "Makefile",
+            filetypes   = (("Makefile" , "Makefile *.mk"),
+                           ("Shell脚本", "*.sh"         )))
+        if not path :
+            return
+        try :
+            BuildScriptWriter(**self.buildArgs()).write(path)
+        except OSError :
+            tk.messagebox.showerror("错误", str(sys.exc_info()[1]))
+            return
+        tk.messagebox.showinfo("生成脚本", "编译脚本已保存到 " + path)
+    def buildArgs         (self) :
+        return {
+            'srcpath' : self.sourcePath.get(),
+            'dstpath' : self.targetPath.get(),
+            'makecmd' : self.makeCmd   .get(),
+            'makearg' : self.makeArgs  .get(),
+            'confarg' : self.configArgs.get(),
+            'makedoc' : self.makeDoc   .get(),
+            'skiperr' : self.skipError .get(),
+            'modjobs' : self.modJobs   .get(),
+            'cleanbld': self.cleanBuild.get(),
+            'ccache'  : 'ccache' if self.useCcache.get() else '',
+            'ccachearg': self.ccacheArg,
+            'modlist' : self.moduleView.selectModuleList()
+        }
+    def onBuildStarted    (self) :
+        # 由工作线程调用, 界面的修改交给界面线程完成
+        self.uiSink.call(self.updateBuildState, True )
+    def onBuildStopped    (self) :
+        self.uiSink.call(self.updateBuildState, False)
+    def updateBuildState  (self, building) :
+        state = 'disabled' if building else 'normal'
+        for it in self.moduleView.moduleList :
+            widget = it.widget
+            widget.config(state = state)
+        for it in self.optWidgets :
+            it.config(state = state)
+
+        if building :
+            # 工作线程可能已经写入了新的输出(在队列中, 排在这次调用之后),
+            # 直接清空文本框, 不能再通过队列清空
+            self.uiSink.clearView('brief' )
+            self.uiSink.clearView('detail')
+
+            self.showDetail.set(1)    
+            self.onShowDetailWindow()
+        elif not self.qtBuilder.retcode :
+            msg = "编译QT时发生错误，请查看详细信息窗口以确认错误原因"
+            tk.messagebox.showerror("发生错误", msg)
+            self.showDetail.set(1)    
+            self.onShowDetailWindow()
+        else :
+            msg = "QTSDK已经成功编译并安装"
+            tk.messagebox.showinfo ("编译完成", msg)
+
+    def createOptionPane  (self) :
+        pane = tk.Frame(self, relief = 'flat')
+        pane.columnconfigure(1, weight  = 10 , minsize = 100)
+        pane.columnconfigure(3, weight  = 10 , minsize = 100)
+        pane.rowconfigure   (0, minsize = 30 )
+        pane.rowconfigure   (1, minsize = 30 )
+        pane.rowconfigure   (2, minsize = 30 )
+        pane.rowconfigure   (3, minsize = 30 )
+        
+        # 1. “源码位置”，输入框，按钮-浏览
+        w = tk.Label(pane, text="源码位置：")
+        w.grid(row        = 0, 
+               column     = 0, 
+               sticky     = ("W", "E"),
+               padx       = 4)
+
+        w = tk.Entry(pane, textvariable = self.sourcePath)
+        w.bind("<Return>", 
+               lambda e: self.onChangeSourcePath())
+        w.grid(row        = 0, 
+               column     = 1, 
+               sticky     = ("W", "E"),
+               columnspan = 3)
+        self.optWidgets.append(w)
+
+        w = tk.Button(pane, text = "浏览", relief  = 'flat')
+        w.config(command  = self.onBrowseSourcePath)
+        w.grid(row        = 0,
+               column     = 4, 
+               sticky     = ("W"), 
+               padx       = 4)
+        self.optWidgets.append(w)
+
+        # 2. “安装位置”，输入框，按钮-浏览
+        w = tk.Label(pane, text = "安装位置：")
+        w.grid(row        = 1, 
+               column     = 0, 
+               sticky     = ("W", "E"),
+               padx       = 4)
+        
+        w = tk.Entry(pane, textvariable = self.targetPath)
+        w.grid(row        = 1, 
+               column     = 1, 
+               sticky     = ("W", "E"),
+               columnspan = 3)
+        self.optWidgets.append(w)
+        
+        w = tk.Button(pane, text = "浏览", relief  = 'flat')
+        w.config(command  = self.onBrowseTargetPath)
+        w.grid(row        = 1, 
+               column     = 4, 
+               sticky     = ("W"), 
+               padx       = 4) 
+        self.optWidgets.append(w)
+
+        # 3. “编译命令：”，输入框-编译命令
+        w = tk.Label(pane, text = "编译命令：")
+        w.grid(row        = 2, 
+               column     = 0, 
+               sticky     = ("W", "E"),
+               padx       = 4)
+
+        w = tk.Entry(pane, textvariable = self.makeCmd   )
+        w.grid(row        = 2, 
+               column     = 1, 
+               sticky     = ("W", "E"))
+        self.optWidgets.append(w)
+
+        w = tk.Label(pane, text = "编译参数：")
+        w.grid(row        = 2, 
+               column     = 2, 
+               sticky     = ("W", "E"),
+               padx       = 4)
+
+        w = tk.Entry(pane, textvariable = self.makeArgs  )
+        w.grid(row        = 2, 
+               column     = 3, 
+               sticky     = ("W", "E"))
+        self.optWidgets.append(w)
+
+        # 4. “配置参数：”，标签-配置参数，按钮-修改
+        w = tk.Label(pane, text = "配置参数：")
+        w.grid(row        = 3, 
+               column     = 0, 
+               sticky     = ('N', 'S', "W", "E"),
+               padx       = 4)
+        w.config(anchor='nw')
+
+        def autowrap(e) :
+            w = e.widget
+            w.config(wraplength = e.width - 10)
+
+        w = tk.Label(pane, textvariable = self.configArgs)
+        w.config(justify    = 'left',
+                 fg         = 'blue',
+                 anchor     = 'nw'  ,
+                 wraplength = 400   )
+        w.bind("<Configure>", autowrap)
+        w.grid(row        = 3, 
+               column     = 1, 
+               sticky     = ('N', 'S', "W", "E"),
+               columnspan = 3)
+        
+        w = tk.Button(pane, text = "修改", relief  = 'flat')
+        w.config(command  = self.onChangeConfigArgs)
+        w.grid(row        = 3, 
+               column     = 4, 
+               sticky     = ("NW"), 
+               padx       = 4) 
+        self.optWidgets.append(w)
+        
+        # 5. 预设参数菜单
+        argmenu = tk.Menu(self, tearoff = 0)
+
+        if platform.system() == "Windows" :
+            cfgname = "winnt-mingw"
+            menucmd = lambda: self.loadConfig("winnt-mingw")
+            argmenu.add_command(label   = cfgname,
+                                command = menucmd)
+            cfgname = "winnt-msvc"
+            menucmd = lambda: self.loadConfig("winnt-msvc" )
+            argmenu.add_command(label   = cfgname,
+                                command = menucmd)
+            cfgname = "winxp-mingw"
+            menucmd = lambda: self.loadConfig("winxp-mingw")
+            argmenu.add_command(label   = cfgname,
+                                command = menucmd)
+        if platform.system() == "Linux"   :
+            cfgname = "linux-g++"
+            menucmd = lambda: self.loadConfig("linux-g++"  )
+            argmenu.add_command(label   = cfgname,
+                                command = menucmd)
+
+        # 6. 按钮-开始编译, 按钮-生成脚本, 复选按钮-详细信息
+        f = tk.Frame(pane)
+        itemList = []
+
+        w = tk.Button     (f, text = "预设参数")
+        w.config(relief = 'flat')
+        w.pack(side = 'right', padx = 4)
+        self.optWidgets.append(w)
+        menubtn = w
+        def showMenu() :
+            x = menubtn.winfo_rootx ()
+            y = menubtn.winfo_rooty ()
+            w = menubtn.winfo_width ()
+            h = menubtn.winfo_height()
+            y = y + h
+            argmenu.post(x, y)
+        menubtn.config(command=showMenu)
+
+
+        w = tk.Checkbutton(f, text = "详细信息")
+        w.config(command  = self.onShowDetailWindow ,
+                 variable = self.showDetail)
+        w.pack(side = 'right', padx = 4)
+        itemList.append(w)
+        
+        w = tk.Spinbox    (f, from_ = 1, to = os.cpu_count() or 1)
+        w.config(textvariable = self.modJobs,
+                 width        = 3)
+        w.pack(side = 'right')
+        itemList.append(w)
+        self.optWidgets.append(w)
+
+        w = tk.Label      (f, text = "并行模块")
+        w.pack(side = 'right', padx = 4)
+        itemList.append(w)
+
+        w = tk.Checkbutton(f, text = "编译缓存")
+        w.config(variable = self.useCcache)
+        w.pack(side = 'right', padx = 4)
+        itemList.append(w)
+        self.optWidgets.append(w)
+
+        w = tk.Checkbutton(f, text = "清理重建")
+        w.config(variable = self.cleanBuild)
+        w.pack(side = 'right', padx = 4)
+        itemList.append(w)
+        self.optWidgets.append(w)
+
+        w = tk.Checkbutton(f, text = "强制构建")
+        w.config(variable = self.skipError )
+        w.pack(side = 'right', padx = 4)
+        itemList.append(w)
+        self.optWidgets.append(w)
+
+        w = tk.Checkbutton(f, text = "生成文档")
+        w.config(variable = self.makeDoc   )
+        w.pack(side = 'right', padx = 4)
+        itemList.append(w)
+        self.optWidgets.append(w)
+
+        w = tk.Button     (f, text = "生成脚本")
+        w.config(command  = self.onSaveBuildScript  ,
+                 relief   = 'flat')
+        w.pack(side = 'right', padx = 4)
+        itemList.append(w)
+
+        w = tk.Button     (f, text = "继续构建")
+        w.config(command  = self.onResumeBuild      ,
+                 relief   = 'flat')
+        w.pack(side = 'right', padx = 4)
+        itemList.append(w)
+        self.optWidgets.append(w)
+
+        w = tk.Button     (f, text = "开始构建")
+        w.config(command  = self.onBuildQt          , 
+                 relief   = 'flat')
+        w.pack(side = 'right', padx = 4)
+        itemList.append(w)
+        self.optWidgets.append(w)
+
+        for it in reversed(itemList) :
+            it.lift()
+
+        f.grid(row        = 4, 
+               column     = 0, 
+               columnspan = 5, 
+               sticky     = ("W", "E"))
+
+        return pane
+    def createStatusPane  (self) :
+        pane = tk.Label(self,
+                        textvariable = self.statusText,
+                        wraplength   = 400,
+                        borderwidth  = 1,
+                        padx         = 4, 
+                        relief       = 'flat', 
+                        anchor       = 'nw', 
+                        justify      = 'left')
+
+        def autowrap(e) :
+            w = e.widget
+            w.config(wraplength = e.width - 10)
+        pane.bind("<Configure>", autowrap)
+
+        return pane
+    def createDetailPane  (self) :
+        top   = tk.Toplevel(self.master)
+        top.protocol("WM_DELETE_WINDOW", self.onHideDetailWindow)
+        top.withdraw()
+
+        pane  = tk.Frame(top, relief = tk.FLAT)
+
+        frame = tk.LabelFrame(pane, text = "主要信息")
+        sbar  = tk.Scrollbar(frame)
+        view  = tk.Text(frame, width = 80, height = 15)
+        view.configure(state = 'disabled')
+        view.configure(yscrollcommand = sbar.set)
+        sbar.configure(command = view.yview)
+
+        view .pack(side = 'left', fill = 'both', expand = True)
+        sbar .pack(side = 'left', fill = 'y')
+        frame.pack(fill = 'both', expand = True)
+        
+        pane.brief   = view
+
+        frame = tk.LabelFrame(pane, text = "详细信息")
+        sbar  = tk.Scrollbar(frame)
+        view  = tk.Text(frame, width = 80, height = 30)
+        view.configure(state = 'disabled')
+        view.configure(yscrollcommand = sbar.set)
+        sbar.configure(command = view.yview)
+
+        view.pack(side = 'left', fill = 'both', expand = True)
+        sbar.pack(side = 'left', fill = 'y')
+        frame.pack(fill = 'both', expand = True)
+        
+        pane.detail = view
+        
+        pane.pack(expand = True, fill='both')
+        
+        return pane
+
+    def updateDetailWindow(self) :
+        top = self.master
+        r = "(\d+)x(\d+)[-+](\d+)[-+](\d+)"
+        m = re.match(r,top.geometry())
+        x = int(m.groups()[2]) + int(m.groups()[0])
+        y = int(m.groups()[3])
+
+        top = self.detailView.master
+        w   = top.winfo_reqwidth ()
+        h   = top.winfo_reqheight()
+        g   = "{w}x{h}+{x}+{y}".format(x = x,
+                                       y = y,
+                                       w = w,
+                                       h = h)
+        top.geometry(g)
+
+    def setQtSourcePath   (self, path) :
+        view = ModuleView(path, self)
+        if not view.moduleList :
+            view.destroy()
+            tk.messagebox.showerror("错误", "无效的源码路径")
+            return False
+
+        if self.moduleView : 
+            self.moduleView.destroy()
+
+        view.grid(row    = 1, 
+                  column = 0, 
+                  pady   = 4, 
+                  sticky = ("W","E","N","S"))
+        view.lift()
+        updateGeometry(self.master)
+
+        self.moduleView = view
+        return True
+    def loadConfig        (self, name) :
+        if name not in QT_CONFIGS :
+            return
+
+        cfg = QT_CONFIGS[name]
+        msg = cfg.get('message', '')
+        if msg:
+            tk.messagebox.showinfo("注意", msg)
+
+        self.configArgs.set(cfg['confarg'])
+        self.makeCmd   .set(cfg['makecmd'])
+        self.makeArgs  .set(cfg['makearg'])
+        self.makeDoc   .set(cfg['makedoc'])
+        self.skipError .set(cfg['skiperr'])
+        self.ccacheArg = cfg.get('ccache', '')
+        
+    def setStatusText     (self, text) :
+        # 编译进度由工作线程更新, 界面的修改交给界面线程完成
+        self.uiSink.call(self.updateStatusText, text)
+    def updateStatusText  (self, text) :
+        # 进度每秒更新一次, 只在状态栏的行数变化时调整窗口大小, 否则
+        # 窗口会随着文本长度不停抖动
+        height = self.statusPane.winfo_reqheight()
+        self.statusText.set(text)
+        self.statusPane.update_idletasks()
+        if self.statusPane.winfo_reqheight() != height :
+            updateGeometry(self.master)
+    def checkUserInput    (self) :
+        if not self.sourcePath.get() :
+            tk.messagebox.showerror("错误", "无效的源码路径")
+            return False
+        if not self.moduleView       :
+            tk.messagebox.showerror("错误", "无效的源码路径")
+            return False
+        if not self.targetPath.get() :
+            tk.messagebox.showerror("错误", "无效的安装路径")
+            return False
+        if not self.makeCmd   .get() :
+            tk.messagebox.showerror("错误", "请输入编译命令")
+            return False
+        if not self.configArgs.get() :
+            tk.messagebox.showerror("错误", "请输入编译参数")
+            return False
+        try :
+            if self.modJobs.get() < 1 :
+                raise ValueError
+        except (tk.TclError, ValueError) :
+            tk.messagebox.showerror("错误", "并行模块数必须是正整数")
+            return False
+        return True
+    def writeDetail       (self, text, *args, **kwargs) :
+        if args or kwargs :
+            text = text.format(*args, **kwargs)
+        self.uiSink.write('detail', text)
+    def writeBrief        (self, text, *args, **kwargs) :
+        if args or kwargs :
+            text = text.format(*args, **kwargs)
+        self.uiSink.write('brief' , text)
+    def clearDetail       (self) :
+        self.uiSink.clear('detail')
+    def clearBrief        (self) :
+        self.uiSink.clear('brief' )
+
+def runGui          () :
+    root = tk.Tk()
+    root.withdraw()
+    root.title("QT构建工具")
+    app  = MainWindow(root)
+    app.pack(expand = True, fill='both')
+    root.wm_minsize(640, 0)
+    root.resizable(False, False)
+    centerWindow(root)
+    root.deiconify()
+
+    preventHibernate(root)
+    root.mainloop()
+    return 0
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+    GNU make 的 jobserver
+"""
+import os
+import re
+import sys
+import shlex
+import select
+
+"""
+    make jobserver：
+        所有同时运行的make共享 jobs 个任务名额. POSIX上是一个管道, 其中的
+        每个字节是一个名额; Windows上是一个命名信号量(mingw32-make 4.x).
+        每个make自己带有一个隐含的名额, 所以启动make之前先取走一个
+        (acquire), make结束以后再放回(release), 这样不论同时编译多少个
+        模块, 编译器进程的总数都不会超过 jobs.
+        make通过环境变量MAKEFLAGS中的 --jobserver-auth(4.2以后)和
+        --jobserver-fds(4.2以前)找到jobserver.
+"""
+class JobServer :
+    TOKEN = b'+'
+
+    def __init__(self, jobs) :
+        self.jobs   = max(1, int(jobs))
+        self.fds    = None
+        self.nbfd   = None
+        self.handle = None
+        self.name   = None
+
+    def start   (self) :
+        if sys.platform == "win32" :
+            self.startSemaphore()
+        else :
+            rfd, wfd = os.pipe()
+            os.write(wfd, JobServer.TOKEN * self.jobs)
+            self.fds = (rfd, wfd)
+        return self
+    def stop    (self) :
+        if self.nbfd is not None :
+            os.close(self.nbfd)
+            self.nbfd = None
+        if self.fds is not None :
+            for it in self.fds :
+                os.close(it)
+            self.fds = None
+        if self.handle is not None :
+            import ctypes
+            ctypes.windll.kernel32.CloseHandle(self.handle)
+            self.handle = None
+    def acquire (self) :
+        """ 取得一个名额, 没有空闲的名额时等待 """
+        if self.handle is not None :
+            import ctypes
+            ctypes.windll.kernel32.WaitForSingleObject(self.handle, 0xFFFFFFFF)
+            return JobServer.TOKEN
+        # 新版本的make会把管道设置为非阻塞方式, 没有名额时等待管道可读
+        while True :
+            try :
+                return os.read(self.fds[0], 1)
+            except BlockingIOError :
+                select.select([self.fds[0]], [], [])
+    def tryAcquire(self) :
+        """
+            立即取得一个名额, 没有空闲的名额时返回None. 不能得到非阻塞的
+            读端(没有/proc)时也返回None
+        """
+        if self.handle is not None :
+            import ctypes
+            if ctypes.windll.kernel32.WaitForSingleObject(self.handle, 0) :
+                return None
+            return JobServer.TOKEN
+        if self.nbfd is None :
+            self.nbfd = openNonBlocking(self.fds[0])
+            if self.nbfd is None :
+                return None
+        try :
+            return os.read(self.nbfd, 1) or None
+        except BlockingIOError :
+            return None
+    def release (self, token) :
+        if self.handle is not None :
+            import ctypes
+            ctypes.windll.kernel32.ReleaseSemaphore(self.handle, 1, None)
+            return
+        os.write(self.fds[1], token)
+    def passFds (self) :
+        """ 子进程需要继承的文件描述符 """
+        return self.fds or ()
+    def makeEnv (self, env) :
+        if self.handle is not None :
+            auth = self.name
+        else :
+            auth = "{0},{1}".format(*self.fds)
+        env['MAKEFLAGS'] = " -j --jobserver-fds={0} --jobserver-auth={0}" \
+                           .format(auth)
+        env.pop('MFLAGS', None)
+        return env
+    def startSemaphore(self) :
+        import ctypes
+        self.name   = "gmake_semaphore_qtbuilder_{0}".format(os.getpid())
+        self.handle = ctypes.windll.kernel32.CreateSemaphoreW(None,
+                                                              self.jobs,
+                                                              self.jobs,
+                                                              self.name)
+        if not self.handle :
+            raise ctypes.WinError()
+
+def openNonBlocking(fd) :
+    # 管道与make共享, 不能改变它的阻塞方式. Linux上通过/proc重新打开
+    # 管道可以得到一个独立的非阻塞的读端. dup得到的描述符与原来的共享
+    # 阻塞方式, 不能使用, 这时返回None
+    try :
+        return os.open("/proc/self/fd/{0}".format(fd),
+                       os.O_RDONLY | os.O_NONBLOCK)
+    except OSError :
+        return None
+
+MAKE_NAMES = ('make', 'gmake', 'mingw32-make')
+
+def isGnuMake(makecmd) :
+    """ makecmd 是否是支持jobserver的GNU make(nmake和jom不支持) """
+    try :
+        words = shlex.split(makecmd, posix = sys.platform != "win32")
+    except ValueError :
+        return False
+    if not words :
+        return False
+    name = os.path.basename(words[0].strip('"')).lower()
+    if name.endswith('.exe') :
+        name = name[:-4]
+    return name in MAKE_NAMES
+
+def stripJobs(makearg) :
+    """ 去掉make参数中的 -jN/--jobs=N, 否则make不使用jobserver """
+    makearg = re.sub(r'(^|\s)(-j\s*\d*|--jobs(=\d+)?)(?=\s|$)', r'\1', makearg)
+    return " ".join(makearg.split())
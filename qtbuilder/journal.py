@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+    构建日志(journal): 记录已经完成的模块阶段, 中断以后可以继续构建
+"""
+import os
+import json
+import time
+import threading
+
+
+"""
+    构建日志：
+        保存在shadow build根目录中, 每行是一个JSON对象. 第一行记录编译参数
+        的摘要(key), 之后每完成一个模块的一个阶段追加一行, 同时记录这个阶段
+        完成时的摘要(例如模块的构建戳); 摘要已经改变(例如源码发生了变化)的
+        阶段不算已经完成. 每次追加以后都
+        调用fsync, 即使程序被强制结束或者机器重启, 已经完成的阶段也不会
+        丢失; 写了一半的最后一行在读取时被丢弃.
+        open(resume) 在要求继续并且编译参数没有变化时保留原有的记录,
+        否则重新开始一个空的日志.
+"""
+class BuildJournal :
+    FILENAME = 'qt-build.journal'
+
+    def __init__(self, root, key) :
+        self.path = os.path.join(root, BuildJournal.FILENAME)
+        self.key  = key
+        self.done = {}
+        self.file = None
+        self.lock = threading.Lock()
+
+    def open    (self, resume = False) :
+        """ 打开日志, 返回是否继续了上次的记录 """
+        size = self.load() if resume else None
+        if size is None :
+            self.done = {}
+            self.file = open(self.path, 'wb')
+            self.append({'key': self.key, 'started': time.time()})
+            syncDir(os.path.dirname(self.path))
+            return False
+        self.file = open(self.path, 'r+b')
+        self.file.truncate(size)
+        self.file.seek(size)
+        return True
+    def load    (self) :
+        """
+            读取原有的记录, 编译参数相同时返回有效记录的长度, 否则返回None
+        """
+        try :
+            with open(self.path, 'rb') as file :
+                lines = file.readlines()
+        except OSError :
+            return None
+        size = 0
+        done = {}
+        for index, line in enumerate(lines) :
+            if not line.endswith(b'\n') :
+                break
+            try :
+                item = json.loads(line.decode('utf-8'))
+                if index == 0 :
+                    if item['key'] != self.key :
+                        return None
+                else :
+                    done[(item['module'], item['phase'])] = item.get('key')
+            except (ValueError, KeyError, TypeError) :
+                if index == 0 :
+                    return None
+                break
+            size += len(line)
+        if not size :
+            return None
+        self.done = done
+        return size
+    def isDone  (self, module, phase, key) :
+        with self.lock :
+            return key is not None and self.done.get((module, phase)) == key
+    def record  (self, module, phase, key) :
+        with self.lock :
+            self.done[(module, phase)] = key
+            self.append({'module': module,
+                         'phase' : phase,
+                         'key'   : key,
+                         'time'  : time.time()})
+    def append  (self, item) :
+        data = json.dumps(item, sort_keys = True) + '\n'
+        self.file.write(data.encode('utf-8'))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+    def close   (self) :
+        with self.lock :
+            if self.file is not None :
+                self.file.close()
+                self.file = None
+
+def syncDir(path) :
+    # 新建的文件需要同步所在的目录, 否则重启以后文件可能不存在
+    if not hasattr(os, 'O_DIRECTORY') :
+        return
+    try :
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError :
+        return
+    try :
+        os.fsync(fd)
+    except OSError :
+        pass
+    finally :
+        os.close(fd)
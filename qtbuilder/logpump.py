@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+    编译日志与子进程输出的读取
+"""
+import os
+import threading
+import time
+import queue
+import codecs
+import locale
+import zlib
+import shutil
+
+
+"""
+    编译日志：
+        一个模块一个阶段的输出. 写入的数据先在内存中积累, 达到 bufsize 
+        或者距离上次写入超过 interval 秒时才整块写入文件; 之后没有新的输出
+        (例如长时间的链接)时, 积累的数据也在 interval 秒以后由定时器写入,
+        程序意外结束时最多丢失这段时间的输出. level 不为None
+        时使用gzip格式压缩(zlib的压缩级别), 整块写入时进行同步刷新, 
+        所以编译过程中也可以用zcat查看. write() 返回的偏移是未压缩数据
+        中的位置, offset 是起始偏移(同一个文件追加写入时使用).
+"""
+class BuildLog :
+    def __init__(self, path, bufsize = 1 << 20, interval = 1.0, 
+                 level = None, offset = None) :
+        self.path     = path
+        self.file     = open(path, 'ab', buffering = 0)
+        self.lock     = threading.Lock()
+        self.bufsize  = bufsize
+        self.interval = interval
+        self.pending  = []
+        self.pendsize = 0
+        self.flushed  = time.monotonic()
+        self.timer    = None
+        self.zip      = None
+        if level is not None :
+            self.zip  = zlib.compressobj(level, zlib.DEFLATED, 31)
+        if offset is None :
+            offset    = self.file.tell() if self.zip is None else 0
+        self.offset   = offset
+
+    def write(self, data) :
+        """ 写入一块数据, 返回它在日志(未压缩)中的偏移位置 """
+        with self.lock :
+            offset = self.offset
+            self.pending.append(data)
+            self.pendsize += len(data)
+            self.offset   += len(data)
+            now = time.monotonic()
+            if self.pendsize >= self.bufsize or \
+               now - self.flushed >= self.interval :
+                self.writeOut()
+            elif self.timer is None :
+                self.timer = threading.Timer(self.interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        return offset
+    def flush(self) :
+        with self.lock :
+            if not self.file.closed :
+                self.writeOut()
+    def close(self) :
+        with self.lock :
+            self.writeOut()
+            if self.zip is not None :
+                self.file.write(self.zip.flush())
+            self.file.close()
+    def writeOut(self) :
+        if self.timer is not None :
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending :
+            return
+        data = b''.join(self.pending)
+        self.pending  = []
+        self.pendsize = 0
+        self.flushed  = time.monotonic()
+        if self.zip is not None :
+            data = self.zip.compress(data) + self.zip.flush(zlib.Z_SYNC_FLUSH)
+        if data :
+            self.file.write(data)
+
+def readLogData(path, offset, size) :
+    """
+        读取日志(未压缩数据)中从offset开始的size个字节. 压缩的日志从头
+        解压, 允许文件没有写完(正在编译)或者由多段gzip数据组成
+    """
+    with open(path, 'rb') as file :
+        if not path.endswith('.gz') :
+            file.seek(offset)
+            return file.read(size)
+
+        result = b''
+        unzip  = zlib.decompressobj(31)
+        pos    = 0
+        while len(result) < size :
+            data = unzip.unused_data or file.read(1 << 16)
+            if not data :
+                break
+            if unzip.unused_data :
+                unzip = zlib.decompressobj(31)
+            try :
+                data = unzip.decompress(data)
+            except zlib.error :
+                break
+            if pos + len(data) > offset :
+                result += data[max(0, offset - pos):]
+            pos += len(data)
+    return result[:size]
+
+"""
+    编译日志目录：
+        每次编译在 root 中创建一个以时间命名的目录, 每个模块的每个阶段
+        写入其中单独的压缩日志. 只保留最近 keep 次编译的日志, 并且所有
+        日志的总大小不超过 maxbytes(当前这次编译除外). level 是压缩级别.
+"""
+class BuildLogDir :
+    def __init__(self, root, keep = 10, maxbytes = 512 << 20, level = 1) :
+        self.root     = root
+        self.keep     = max(1, keep)
+        self.maxbytes = maxbytes
+        self.level    = level
+        self.path     = None
+        self.offsets  = {}
+        self.lock     = threading.Lock()
+
+    def create (self) :
+        os.makedirs(self.root, exist_ok = True)
+        name  = time.strftime('%Y%m%d-%H%M%S')
+        path  = os.path.join(self.root, name)
+        count = 1
+        while os.path.exists(path) :
+            path   = os.path.join(self.root, "{0}-{1}".format(name, count))
+            count += 1
+        os.makedirs(path)
+        self.path = path
+        self.prune()
+        return path
+    def open   (self, module, phase) :
+        name = streamName(module, phase)
+        with self.lock :
+            offset = self.offsets.get(name, 0)
+        return BuildLog(os.path.join(self.path, name),
+                        level  = self.level,
+                        offset = offset)
+    def release(self, log) :
+        # 同一阶段再次执行时(例如重试)追加到同一个文件, 偏移继续增长
+        log.close()
+        with self.lock :
+            self.offsets[os.path.basename(log.path)] = log.offset
+    def prune  (self) :
+        builds = listBuilds(self.root)
+        old    = [it for it in builds if it != self.path]
+        while old and len(old) >= self.keep :
+            shutil.rmtree(old.pop(0), ignore_errors = True)
+        sizes  = [(it, treeSize(it)) for it in old]
+        total  = sum(it[1] for it in sizes)
+        while sizes and total > self.maxbytes :
+            path, size = sizes.pop(0)
+            shutil.rmtree(path, ignore_errors = True)
+            total -= size
+
+def streamName(module, phase) :
+    return "{0}.{1}.log.gz".format(module or 'qt-builder', phase or 'command')
+def listBuilds(root) :
+    """ root 中各次编译的日志目录, 从旧到新 """
+    try :
+        names = sorted(it.name for it in os.scandir(root) if it.is_dir())
+    except OSError :
+        return []
+    return [os.path.join(root, it) for it in names]
+def treeSize(path) :
+    total = 0
+    for root, dirs, files in os.walk(path) :
+        for it in files :
+            try :
+                total += os.path.getsize(os.path.join(root, it))
+            except OSError :
+                pass
+    return total
+
+"""
+    输出泵：
+        在独立的线程中以大块二进制方式读取子进程的输出管道, 按完整的行切分
+        以后写入编译日志, 然后放入队列. 使用者在自己的线程中通过 chunks()
+        取出解码后的文本; 读取线程从不等待使用者, 子进程不会因为输出处理
+        得慢而被阻塞.
+        scanner(数据块, 日志偏移) 在读取线程中检查每一块输出(诊断信息索引).
+"""
+class OutputPump :
+    CHUNKSIZE = 64 * 1024
+    MAXLINE   = 1024 * 1024
+
+    def __init__(self, stream, log = None, encoding = None, scanner = None) :
+        self.stream   = stream
+        self.log      = log
+        self.scanner  = scanner
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.queue    = queue.Queue()
+        self.thread   = threading.Thread(target = self.pumpThread,
+                                         name   = 'pump',
+                                         daemon = True)
+
+    def start     (self) :
+        self.thread.start()
+        return self
+    def chunks    (self) :
+        """ 
+            逐块返回 (文本, 日志偏移), 队列中积压的多个数据块会被合并
+            成一块返回, 直到子进程关闭输出管道
+        """
+        decoder = codecs.getincrementaldecoder(self.encoding)('replace')
+        while True :
+            item = self.queue.get()
+            if item is None :
+                break
+            offset, blocks = item[0], [item[1]]
+            finished = False
+            while True :
+                try :
+                    item = self.queue.get_nowait()
+                except queue.Empty :
+                    break
+                if item is None :
+                    finished = True
+                    break
+                blocks.append(item[1])
+            yield decoder.decode(b''.join(blocks)), offset
+            if finished :
+                break
+        self.thread.join()
+    def pumpThread(self) :
+        fd      = self.stream.fileno()
+        pending = b''
+        try :
+            while True :
+                data = os.read(fd, OutputPump.CHUNKSIZE)
+                if not data :
+                    break
+                if pending :
+                    data = pending + data
+                cut = data.rfind(b'\n') + 1
+                if cut == 0 and len(data) < OutputPump.MAXLINE :
+                    pending = data
+                    continue
+                if cut == 0 :
+                    cut = len(data)
+                pending = data[cut:]
+                self.emit(data[:cut])
+            if pending :
+                self.emit(pending)
+        finally :
+            self.stream.close()
+            if self.log is not None :
+                self.log.flush()
+            self.queue.put(None)
+    def emit      (self, block) :
+        offset = self.log.write(block) if self.log is not None else 0
+        if self.scanner is not None :
+            self.scanner(block, offset)
+        self.queue.put((offset, block))
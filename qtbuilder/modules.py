@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+"""
+    QT 模块目录: 模块类型, 已知模块的描述信息以及源码中模块的查找
+"""
+import os
+import enum
+import copy
+
+from .graph import ModuleGraph
+
+
+"""
+    QT 模块类型：
+        qtbase   : 基础框架，没他就没QT
+        suggested: 推荐组件，非常有用
+        osspec   : 系统组件，只能在特定操作系统上使用
+        optional : 可选组件，提供特定功能，按需选择
+        unknown  : 未知组件，不在QT5.10.0的源码包中
+"""
+class ModuleType(enum.IntEnum) :
+    QTBASE    = 0
+    SUGGESTED = 1
+    OSSPEC    = 2
+    OPTIONAL  = 3
+    UNKNOWN   = 4
+    
+    def __str__(self) :
+        nameList = (
+            "基础框架", "推荐组件", "系统组件", 
+            "可选组件", "未知组件"
+        )
+        return nameList[self.value]
+
+"""
+    QT 模块描述信息, 由作者（kayven）本人按照个人需求与喜好主观认定
+    目前版本为QT 5.10.0
+"""
+KNOWN_MODULES = { 
+    # 基础框架，没他就没QT
+    'qtbase'            : {
+        'name'          : 'qtbase',
+        'description'   : '核心模块, 提供QT的核心功能和基础框架. 必须构建或者'
+                          '存在于\"安装路径\"指定的位置',
+        'type'          : ModuleType.QTBASE,
+        'os'            : 'all',
+        'selected'      : True,
+        'dependence'    : []
+    },
+    # 重要的QT模块，功能完善，非常有用
+    'qtdeclarative'     : {
+        'name'          : 'qtdeclarative',
+        'description'   : 'QML引擎,所有QML模块都需要它才能编译,没它就没QML',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase']   
+    },
+    'qtquickcontrols'   : {
+        'name'          : 'qtquickcontrols',
+        'description'   : 'QML控件库-V1,提供了基础的QML界面控件',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtquickcontrols2'  : {
+        'name'          : 'qtquickcontrols2',
+        'description'   : 'QML控件库-V2,提供了更好看和更多的QML界面控件. '
+                          '建议编译',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase','qtdeclarative']   
+    },
+    'qtimageformats'    : {
+        'name'          : 'qtimageformats',
+        'description'   : '提供多种图像格式的支持(包括JPG，PNG等等)',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase']   
+    },
+    'qtmultimedia'      : {
+        'name'          : 'qtmultimedia',
+        'description'   : '提供基本的音视频编解码支持,可以用来做简单的影视片播放'
+                          '和图像处理. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase','qtdeclarative']   
+    },
+    'qtserialport'      : {
+        'name'          : 'qtserialport',
+        'description'   : '提供比较完善的串口设备访问支持. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase']   
+    },
+    'qtsvg'             : {
+        'name'          : 'qtsvg',
+        'description'   : '提供了不完善但是基本可用的SVG图像格式支持. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase']   
+    },
+    'qtxmlpatterns'     : {
+        'name'          : 'qtxmlpatterns',
+        'description'   : 'XML扩展支持模块(包括XPath, XSLT, XQuery等). ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase']   
+    },
+    'qtdoc'             : {
+        'name'          : 'qtdoc',
+        'description'   : '用于处理和生成QT格式文档(qdoc)的工具库. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase']   
+    },
+    'qttools'           : {
+        'name'          : 'qttools',
+        'description'   : 'QT开发辅助工具(assist，designer和linguist). ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase','qtdeclarative']   
+    },
+    'qttranslations'    : {
+        'name'          : 'qttranslations',
+        'description'   : 'QT多语言支持. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase']   
+    },
+    'qt3d'              : {
+        'name'          : 'qt3d',
+        'description'   : 'QT 3D绘图/渲染支持库. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtcharts'          : {
+        'name'          : 'qtcharts',
+        'description'   : 'QT 2D图表库,相当有用. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtcanvas3d'        : {
+        'name'          : 'qtcanvas3d',
+        'description'   : 'QT/QML 3D绘图/渲染支持库, 提供canvas标准接口. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtdatavis3d'       : {
+        'name'          : 'qtdatavis3d',
+        'description'   : 'QT 3D图表库, 不太完善但基本可用. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtwebsockets'      : {
+        'name'          : 'qtwebsockets',
+        'description'   : 'QT WebSocket支持库. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtgraphicaleffects': {
+        'name'          : 'qtgraphicaleffects',
+        'description'   : 'QML图形变换效果支持库. ',
+        'type'          : ModuleType.SUGGESTED,
+        'os'            : 'all',
+        'selected'      : True , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    # 只能在特定操作系统上编译/运行的模块 
+    'qtactiveqt'        : {
+        'name'          : 'qtactiveqt',
+        'description'   : 'QT ActiveX控件支持，只能用于Windows系统. ',
+        'type'          : ModuleType.OSSPEC,
+        'os'            : 'windows',
+        'selected'      : False    , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtwinextras'       : {
+        'name'          : 'qtwinextras',
+        'description'   : '提供windows特有的界面功能. ',
+        'type'          : ModuleType.OSSPEC,
+        'os'            : 'windows',
+        'selected'      : False    , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtx11extras'       : {
+        'name'          : 'qtx11extras',
+        'description'   : '提供x11窗口系统特有的界面功能. ',
+        'type'          : ModuleType.OSSPEC,
+        'os'            : 'linux/posix',
+        'selected'      : False        , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtandroidextras'   : {
+        'name'          : 'qtandroidextras',
+        'description'   : '提供android特有的界面功能. ',
+        'type'          : ModuleType.OSSPEC,
+        'os'            : 'android',
+        'selected'      : False    , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtmacextras'       : {
+        'name'          : 'qtmacextras',
+        'description'   : '提供mac os特有的界面功能. ',
+        'type'          : ModuleType.OSSPEC,
+        'os'            : 'mac os x',
+        'selected'      : False     , 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtserialbus'       : {
+        'name'          : 'qtserialbus',
+        'description'   : '官方说用于Linux/BootToQT的一个模块, 不知道干嘛的. ',
+        'type'          : ModuleType.OSSPEC,
+        'os'            : 'linux',
+        'selected'      : False  , 
+        'dependence'    : ['qtbase']   
+    },
+    # 比较鸡肋的模块, 用处不大麻烦不少 
+    'qtvirtualkeyboard' : {
+        'name'          : 'qtvirtualkeyboard',
+        'description'   : 'QT虚拟键盘模块, 商业许可证, 而且不好用. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtconnectivity'    : {
+        'name'          : 'qtconnectivity',
+        'description'   : '蓝牙/NFC等连接支持, 不完善. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtgamepad'         : {
+        'name'          : 'qtgamepad',
+        'description'   : '游戏手柄, 摇杆, 虚拟摇杆等支持, 不完善. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']
+    },
+    'qtlocation'        : {
+        'name'          : 'qtlocation',
+        'description'   : 'QT地理位置支持模块，不完善但基本可用. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtremoteobjects'   : {
+        'name'          : 'qtremoteobjects',
+        'description'   : '5.10新增，不知道干嘛的. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtpurchasing'      : {
+        'name'          : 'qtpurchasing',
+        'description'   : 'QT交易市场库，莫名其妙，不建议用. '
+                          '建议放弃',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtnetworkauth'     : {
+        'name'          : 'qtnetworkauth',
+        'description'   : '似乎是网络认证支持, 没用过, 不知道. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtscxml'           : {
+        'name'          : 'qtscxml',
+        'description'   : 'scxml支持模块，不完善而且没啥用. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtsensors'         : {
+        'name'          : 'qtsensors',
+        'description'   : '传感器支持，不完善而且需要特定硬件. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtspeech'          : {
+        'name'          : 'qtspeech',
+        'description'   : 'QT也有TTS, 你敢信? 你敢用? ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtwebchannel'      : {
+        'name'          : 'qtwebchannel',
+        'description'   : '没用过, 不知道干嘛的. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtwayland'         : {
+        'name'          : 'qtwayland',
+        'description'   : 'QT导航支持, 不完善, 不好用. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtwebglplugin'     : {
+        'name'          : 'qtwebglplugin',
+        'description'   : '没用过, 不知道干嘛的. 估计还需要WebEngine. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtwebview'         : {
+        'name'          : 'qtwebview',
+        'description'   : '在智能手机平台上还行(使用手机浏览器作为后端), '
+                          '桌面操作系统上需要WebEngine. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    },
+    'qtscript'          : {
+        'name'          : 'qtscript',
+        'description'   : '被放弃的QML引擎, 早就被qtdeclarative取代了. ',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase']   
+    },
+    'qtwebengine'       : {
+        'name'          : 'qtwebengine',
+        'description'   : '使用chromium作为后端的web浏览器模块, 其实还算'
+                          '挺好用的, 就是编译太麻烦了...',
+        'type'          : ModuleType.OPTIONAL,
+        'os'            : 'all',
+        'selected'      : False, 
+        'dependence'    : ['qtbase', 'qtdeclarative']   
+    }
+}
+
+def queryModuleList (path) :
+    try:
+        dirList = os.scandir(path)
+    except:
+        return []
+
+    modList = []
+    for it in dirList :
+        if len(it.name) <= 2 or it.name[0:2] != "qt" or not it.is_dir():
+            continue 
+        if it.name not in KNOWN_MODULES :
+            info = {
+                'name'       : it.name,
+                'description': '未知模块',
+                'type'       : ModuleType.UNKNOWN,
+                'os'         : '未知',
+                'selected'   : False , 
+                'dependence' : ['qtbase']
+            }
+        else:
+            info = KNOWN_MODULES[it.name]
+        mod = type('QtModule', (object,), copy.deepcopy(info))
+        
+        modList.append(mod)
+
+    # 依赖的模块在前, 关键路径长的模块在前
+    return ModuleGraph(modList).order()
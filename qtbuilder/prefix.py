@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+    安装路径中已经安装的QT基础框架(qtbase)
+"""
+import os
+import re
+import sys
+import json
+import subprocess
+
+
+# 安装qtbase以后在安装路径中记录它的编译参数摘要
+RECORD = 'qt-builder.qtbase.json'
+
+def readRecord(prefix) :
+    try :
+        with open(os.path.join(prefix, RECORD), encoding = 'utf-8') as file :
+            record = json.load(file)
+    except (OSError, ValueError) :
+        return None
+    return record if isinstance(record, dict) else None
+def writeRecord(prefix, record) :
+    path = os.path.join(prefix, RECORD)
+    temp = path + '.tmp'
+    with open(temp, 'w', encoding = 'utf-8') as file :
+        json.dump(record, file)
+    os.replace(temp, path)
+
+def qmakePath(prefix) :
+    name = 'qmake.exe' if sys.platform == "win32" else 'qmake'
+    return os.path.join(prefix, 'bin', name)
+def queryQmake(qmake, env = None) :
+    """ qmake -query 的结果, qmake不存在或者不能运行时返回None """
+    if not os.path.isfile(qmake) :
+        return None
+    try :
+        output = subprocess.run([qmake, '-query'],
+                                env     = env,
+                                stdout  = subprocess.PIPE,
+                                stderr  = subprocess.DEVNULL,
+                                timeout = 30).stdout
+    except (OSError, subprocess.SubprocessError) :
+        return None
+    info = {}
+    for line in output.decode('utf-8', 'replace').splitlines() :
+        name, sep, value = line.partition(':')
+        if sep :
+            info[name.strip()] = value.strip()
+    return info or None
+
+def sourceVersion(srcpath) :
+    """ 源码中qtbase的版本(qtbase/.qmake.conf中的MODULE_VERSION) """
+    try :
+        with open(os.path.join(srcpath, 'qtbase', '.qmake.conf'),
+                  encoding = 'utf-8', errors = 'replace') as file :
+            text = file.read()
+    except OSError :
+        return None
+    match = re.search(r'^\s*MODULE_VERSION\s*=\s*(\S+)', text, re.M)
+    return match.group(1) if match else None
+
+def samePath(a, b) :
+    if not a or not b :
+        return False
+    return os.path.normcase(os.path.realpath(a)) == \
+           os.path.normcase(os.path.realpath(b))
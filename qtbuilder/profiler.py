@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+    编译命令进程树的资源使用采样
+"""
+import os
+import time
+import threading
+import collections
+
+
+ProcStat = collections.namedtuple('ProcStat', 'ppid comm cpu rss')
+
+def processTable() :
+    """
+        /proc 中所有进程的 {pid: ProcStat}. cpu 是进程本身和它等待过的
+        子进程的CPU秒数之和, rss 单位为字节
+    """
+    pagesize = os.sysconf('SC_PAGE_SIZE')
+    ticks    = os.sysconf('SC_CLK_TCK')
+    table    = {}
+    for name in os.listdir('/proc') :
+        if not name.isdigit() :
+            continue
+        try :
+            with open('/proc/{0}/stat'.format(name), 'rb') as file :
+                data = file.read()
+        except OSError :
+            continue
+        # 进程名可能包含空格和括号, 以最后一个右括号为准
+        comm   = data[data.find(b'(') + 1 : data.rfind(b')')]
+        fields = data[data.rfind(b')') + 2 :].split()
+        cpu    = sum(int(it) for it in fields[11:15]) / ticks
+        table[int(name)] = ProcStat(int(fields[1]),
+                                    comm.decode('utf-8', 'replace'),
+                                    cpu,
+                                    int(fields[21]) * pagesize)
+    return table
+def childrenMap(table) :
+    children = {}
+    for pid, it in table.items() :
+        children.setdefault(it.ppid, []).append(pid)
+    return children
+def descendants(children, root) :
+    """ root的所有后代进程, 不包括root本身 """
+    found   = []
+    pending = list(children.get(root, []))
+    while pending :
+        pid = pending.pop()
+        found.append(pid)
+        pending.extend(children.get(pid, []))
+    return found
+def readIo(pid) :
+    """ 进程(包括它等待过的子进程)读写存储设备的字节数 """
+    read  = 0
+    write = 0
+    try :
+        with open('/proc/{0}/io'.format(pid), 'rb') as file :
+            for line in file :
+                if line.startswith(b'read_bytes:') :
+                    read  = int(line.split()[1])
+                elif line.startswith(b'write_bytes:') :
+                    write = int(line.split()[1])
+    except (OSError, ValueError) :
+        pass
+    return read, write
+
+"""
+    资源采样：
+        后台线程每隔 interval 秒读取一次/proc, 对每个正在运行的编译命令
+        (watch)统计它的进程树: 进程数, CPU使用(核数), 所有进程的内存之和,
+        最大的单个进程内存和磁盘读写字节数. 已经结束并被树中的进程等待过
+        的进程, 它们的CPU时间和读写字节数计入等待它的进程, 所以累计值
+        不会因为编译器进程结束而丢失.
+        每次采样写入时间序列文件(制表符分隔), unwatch() 返回这个命令的
+        汇总, 同时保存在 summaries 中. 只支持Linux.
+"""
+class ResourceProfiler :
+    COLUMNS = ('time', 'module', 'phase', 'procs', 'cpu', 'rss', 'rss_max',
+               'read_bytes', 'write_bytes')
+
+    class Watch :
+        def __init__(self, pid, module, phase) :
+            self.pid      = pid
+            self.module   = module
+            self.phase    = phase
+            self.start    = time.monotonic()
+            self.last     = (self.start, 0.0)
+            self.samples  = 0
+            self.cpuPeak  = 0.0
+            self.rssPeak  = 0
+            self.rssTotal = 0
+            self.rssMax   = 0
+            self.procs    = 0
+            self.io       = (0, 0)
+
+        def add    (self, now, cpu, rss, rssmax, procs, io) :
+            """ 记录一次采样, 返回与上次采样之间的CPU使用(核数) """
+            # 树中的进程退出而没有被等待时累计值会减少, 取最大值
+            cpu   = max(cpu, self.last[1])
+            usage = 0.0
+            if now > self.last[0] :
+                usage = (cpu - self.last[1]) / (now - self.last[0])
+            self.cpuPeak   = max(self.cpuPeak, usage)
+            self.last      = (now, cpu)
+            self.samples  += 1
+            self.rssPeak   = max(self.rssPeak, rss)
+            self.rssTotal += rss
+            self.rssMax    = max(self.rssMax, rssmax)
+            self.procs     = max(self.procs, procs)
+            self.io        = (max(self.io[0], io[0]), max(self.io[1], io[1]))
+            return usage
+        def summary(self) :
+            seconds = max(self.last[0] - self.start, 1e-6)
+            return {
+                'module'     : self.module,
+                'phase'      : self.phase,
+                'seconds'    : round(seconds, 3),
+                'samples'    : self.samples,
+                'cpu_avg'    : round(self.last[1] / seconds, 2),
+                'cpu_peak'   : round(self.cpuPeak, 2),
+                'rss_peak'   : self.rssPeak,
+                'rss_avg'    : self.rssTotal // max(1, self.samples),
+                'rss_max'    : self.rssMax,
+                'procs_peak' : self.procs,
+                'read_bytes' : self.io[0],
+                'write_bytes': self.io[1],
+            }
+
+    def __init__(self, path, interval = 1.0) :
+        self.path      = path
+        self.interval  = interval
+        self.lock      = threading.Lock()
+        self.sampling  = threading.Lock()
+        self.watches   = {}
+        self.summaries = []
+        self.file      = None
+        self.origin    = time.monotonic()
+        self.stopped   = threading.Event()
+        self.thread    = threading.Thread(target = self.sampleThread,
+                                          name   = 'profiler',
+                                          daemon = True)
+
+    @staticmethod
+    def supported() :
+        return os.path.exists('/proc/self/stat')
+
+    def start  (self) :
+        self.file = open(self.path, 'w', encoding = 'utf-8')
+        self.file.write("\t".join(ResourceProfiler.COLUMNS) + "\n")
+        self.thread.start()
+        return self
+    def stop   (self) :
+        self.stopped.set()
+        self.thread.join()
+        with self.lock :
+            self.file.close()
+    def watch  (self, pid, module, phase) :
+        watch = ResourceProfiler.Watch(pid, module, phase)
+        with self.lock :
+            self.watches[pid] = watch
+        return watch
+    def unwatch(self, watch) :
+        """ 命令结束前最后采样一次, 返回汇总 """
+        try :
+            self.sample([watch])
+        except OSError :
+            pass
+        with self.lock :
+            self.watches.pop(watch.pid, None)
+            summary = watch.summary()
+            self.summaries.append(summary)
+        return summary
+    def sampleThread(self) :
+        while not self.stopped.wait(self.interval) :
+            with self.lock :
+                watches = list(self.watches.values())
+            if not watches :
+                continue
+            try :
+                self.sample(watches)
+            except OSError :
+                pass
+    def sample (self, watches) :
+        # 后台线程和unwatch()可能同时采样
+        with self.sampling :
+            self.sampleWatches(watches)
+    def sampleWatches(self, watches) :
+        table    = processTable()
+        children = childrenMap(table)
+        now      = time.monotonic()
+        lines    = []
+        for it in watches :
+            if it.pid not in table :
+                continue
+            pids  = [it.pid] + descendants(children, it.pid)
+            stats = [table[pid] for pid in pids if pid in table]
+            ios   = [readIo(pid) for pid in pids]
+            cpu   = sum(st.cpu for st in stats)
+            rss   = sum(st.rss for st in stats)
+            io    = (sum(x[0] for x in ios), sum(x[1] for x in ios))
+            rssmax = max(st.rss for st in stats)
+            usage  = it.add(now, cpu, rss, rssmax, len(stats), io)
+            lines.append("{0:.3f}\t{1}\t{2}\t{3}\t{4:.2f}\t{5}\t{6}\t{7}\t{8}\n"
+                         .format(now - self.origin,
+                                 it.module or '',
+                                 it.phase or '',
+                                 len(stats),
+                                 usage,
+                                 rss,
+                                 rssmax,
+                                 io[0],
+                                 io[1]))
+        with self.lock :
+            if self.file is not None and not self.file.closed :
+                self.file.writelines(lines)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+    编译进度和剩余时间的估计
+"""
+import os
+import re
+import json
+import time
+import threading
+
+
+# 每个编译的源文件在输出中有一个标记, 在输出的数据块中直接计数, 不需要
+# 按行解析:
+#   编译命令中的" -c "(gcc, clang, cl)
+#   qmake生成的静默(-silent)Makefile输出的"compiling foo.cpp"
+#   cl.exe每编译一个文件输出的文件名
+COMPILE_MARK = re.compile(br' -c |^compiling |'
+                          br'^[^\s/\\:]+\.(?:cpp|cxx|cc|c|mm?)\r?$', re.M)
+
+"""
+    编译进度：
+        统计每个模块make阶段编译的源文件数量, 与这个模块上次完整编译时的
+        数量(保存在 history 文件中)比较, 得到模块内的进度. 没有记录的模块
+        在完成之前进度为0.
+        整体进度按照各模块预计的编译时间(weights, 单位秒, 来自以前的
+        计时记录)加权, 剩余时间按照 已用时间 * (1 - 进度) / 进度 估计.
+        start() 以后每隔 interval 秒调用 report(状态文本).
+"""
+class BuildProgress :
+    def __init__(self, modules, history, weights = None,
+                 interval = 1.0, report = None) :
+        self.modules  = list(modules)
+        self.history  = history
+        self.expected = loadHistory(history)
+        weights       = dict((k, v) for k, v in (weights or {}).items()
+                             if k in self.modules and v > 0)
+        average       = sum(weights.values()) / len(weights) \
+                        if weights else 1.0
+        self.weights  = dict((it, weights.get(it, average))
+                             for it in self.modules)
+        self.interval = interval
+        self.report   = report
+        self.lock     = threading.Lock()
+        self.running  = {}
+        self.finished = {}
+        self.begin    = time.monotonic()
+        self.stopped  = threading.Event()
+        self.thread   = threading.Thread(target = self.reportThread,
+                                         name   = 'progress',
+                                         daemon = True)
+
+    def start   (self) :
+        self.begin = time.monotonic()
+        self.thread.start()
+        return self
+    def stop    (self) :
+        self.stopped.set()
+        if self.thread.is_alive() :
+            self.thread.join()
+        if self.report is not None :
+            self.report("")
+    def reportThread(self) :
+        while not self.stopped.wait(self.interval) :
+            self.report(self.statusText())
+
+    def startModule (self, module) :
+        with self.lock :
+            self.running[module] = [0]
+    def counter     (self, module) :
+        """ 返回一个函数, 统计模块make阶段输出的数据块中的编译命令 """
+        with self.lock :
+            steps = self.running.setdefault(module, [0])
+        def count(block, offset) :
+            # 每个模块只有一个线程在写, 不需要加锁
+            steps[0] += len(COMPILE_MARK.findall(block))
+        return count
+    def finishModule(self, module, ok) :
+        with self.lock :
+            steps = self.running.pop(module, [0])[0]
+            self.finished[module] = ok
+            # 增量编译只执行少量编译命令, 不作为完整编译的数量
+            if ok and steps and steps * 2 > self.expected.get(module, 0) :
+                self.expected[module] = steps
+                changed = True
+            else :
+                changed = False
+        if changed :
+            try :
+                saveHistory(self.history, self.expected)
+            except OSError :
+                pass
+
+    def moduleFraction(self, module, steps) :
+        expected = self.expected.get(module)
+        if not expected :
+            return 0.0
+        return min(0.99, steps / expected)
+    def overall (self) :
+        """ (整体进度, 正在编译的模块 [(名称, 进度, 编译命令数)]) """
+        with self.lock :
+            running  = [(k, self.moduleFraction(k, v[0]), v[0])
+                        for k, v in self.running.items()]
+            finished = list(self.finished)
+        total = sum(self.weights.values()) or 1.0
+        done  = sum(self.weights.get(it, 0) for it in finished)
+        done += sum(self.weights.get(k, 0) * f for k, f, _ in running)
+        return min(1.0, done / total), running
+    def statusText(self) :
+        fraction, running = self.overall()
+        parts = []
+        for name, part, steps in running :
+            if self.expected.get(name) :
+                parts.append("{0} {1:.0%}".format(name, part))
+            else :
+                parts.append("{0} ({1})".format(name, steps))
+        text = "已完成 {0}/{1} 个模块, 总进度 {2:.0%}".format(
+            len(self.finished), len(self.modules), fraction)
+        elapsed = time.monotonic() - self.begin
+        if fraction >= 0.01 :
+            text += ", 预计还需 " + formatDuration(
+                elapsed * (1 - fraction) / fraction)
+        if parts :
+            text += " | 正在编译: " + ", ".join(parts)
+        return text
+
+def loadHistory(path) :
+    try :
+        with open(path, encoding = 'utf-8') as file :
+            data = json.load(file)
+    except (OSError, ValueError) :
+        return {}
+    return dict((k, v) for k, v in data.items() if isinstance(v, int))
+def saveHistory(path, data) :
+    temp = path + '.tmp'
+    with open(temp, 'w', encoding = 'utf-8') as file :
+        json.dump(data, file, sort_keys = True)
+    os.replace(temp, path)
+
+def formatDuration(seconds) :
+    seconds = int(seconds)
+    if seconds < 60 :
+        return "{0} 秒".format(seconds)
+    if seconds < 3600 :
+        return "{0} 分钟".format((seconds + 59) // 60)
+    return "{0} 小时 {1:02d} 分".format(seconds // 3600, seconds % 3600 // 60)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+    按照模块依赖关系调度构建任务
+"""
+import traceback
+import concurrent.futures
+
+
+"""
+    模块构建调度器：
+        按照模块的依赖关系(dependence)调度构建任务. 一个任务所依赖的任务全部
+        结束以后, 它才会被启动; 同时运行的任务不超过 jobs 个. 依赖列表中不在
+        调度器内的模块被认为已经安装在"安装路径"中.
+        同时有多个任务就绪时, 优先级(priority, 例如模块的关键路径长度)高的
+        先启动, 优先级相同时按照添加的先后顺序启动.
+        任务可以分组(group), 每组有各自的并发数量(setLimit), 例如文档任务
+        不占用模块编译的名额. 没有设置数量的组同时运行 jobs 个任务.
+        失败以后继续调度时(keepGoing), 直接或者间接依赖失败任务的任务不再
+        执行, 立即被标记为失败; causes 记录它们因为哪些任务的失败而被跳过.
+        因为循环依赖而永远不能启动的任务也被标记为失败, 记录在 blocked 中.
+"""
+class BuildScheduler :
+    class Task :
+        def __init__(self, name, func, deps, group, priority) :
+            self.name     = name
+            self.func     = func
+            self.deps     = list(deps)
+            self.group    = group
+            self.priority = priority
+            self.error    = None
+
+    def __init__(self, jobs = 1) :
+        self.jobs    = max(1, int(jobs))
+        self.tasks   = []
+        self.limits  = {}
+        self.results = {}
+        self.causes  = {}
+        self.blocked = []
+
+    def setLimit(self, group, jobs) :
+        self.limits[group] = max(1, int(jobs))
+    def limit   (self, group) :
+        return self.limits.get(group, self.jobs)
+    def addTask (self, name, func, deps = (), group = None, priority = 0) :
+        task = BuildScheduler.Task(name, func, deps, group, priority)
+        self.tasks.append(task)
+        return task
+    def run     (self, keepGoing = False, onSkip = None) :
+        """
+            执行所有任务, 全部成功时返回True. 有任务失败, 被跳过或者因为
+            循环依赖而没有执行时返回False.
+            keepGoing为真时, 失败的任务被视为已结束, 与它无关的任务继续
+            执行, 依赖它的任务被跳过, 并调用 onSkip(任务, 原因列表)
+        """
+        names   = set(it.name for it in self.tasks)
+        groups  = set(it.group for it in self.tasks)
+        pending = sorted(self.tasks, key = lambda it : -it.priority)
+        running = {}
+        active  = dict((it, 0) for it in groups)
+        stopped = False
+
+        self.results = {}
+        self.causes  = {}
+        self.blocked = []
+        workers = sum(self.limit(it) for it in groups) or 1
+        with concurrent.futures.ThreadPoolExecutor(
+                workers, thread_name_prefix = 'build') as pool :
+            while True :
+                for task in list(pending) :
+                    if stopped :
+                        break
+                    causes = self.failedDeps(task)
+                    if causes :
+                        pending.remove(task)
+                        self.results[task.name] = False
+                        self.causes [task.name] = causes
+                        if onSkip is not None :
+                            onSkip(task, causes)
+                        continue
+                    if active[task.group] >= self.limit(task.group) :
+                        continue
+                    if not self.isReady(task, names) :
+                        continue
+                    pending.remove(task)
+                    active[task.group] += 1
+                    running[pool.submit(task.func)] = task
+
+                if not running :
+                    break
+
+                done, _ = concurrent.futures.wait(
+                    running,
+                    return_when = concurrent.futures.FIRST_COMPLETED)
+                for future in done :
+                    task = running.pop(future)
+                    active[task.group] -= 1
+                    try :
+                        ok = bool(future.result())
+                    except Exception :
+                        ok = False
+                        task.error = traceback.format_exc()
+                    self.results[task.name] = ok
+                    if not ok and not keepGoing :
+                        stopped = True
+
+        if stopped :
+            return False
+        # 没有正在运行的任务时仍未启动的任务, 它们的依赖构成了循环
+        for task in pending :
+            self.results[task.name] = False
+            self.blocked.append(task.name)
+        return all(self.results.values())
+    def failedDeps(self, task) :
+        """ 任务所依赖的任务中失败的根源, 没有失败时返回空列表 """
+        causes = []
+        for dep in task.deps :
+            if self.results.get(dep, True) :
+                continue
+            for it in self.causes.get(dep, [dep]) :
+                if it not in causes :
+                    causes.append(it)
+        return causes
+    def isReady (self, task, names) :
+        for dep in task.deps :
+            if dep in names and dep not in self.results :
+                return False
+        return True
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+    生成独立的编译脚本(Makefile或者shell脚本)
+"""
+import os
+import re
+import shlex
+
+from .modules import ModuleType
+from .ccache  import CompilerCache
+
+
+"""
+    编译脚本生成器：
+        按照与QTBuilder相同的参数生成不需要python和tk支持的编译脚本.
+            Makefile : 每个模块一个目标, 按照模块依赖关系建立规则, 
+                       使用 make -jN 即可同时编译多个模块
+            Shell脚本: 按照依赖关系把模块分成若干批, 同一批的模块最多
+                       同时编译 MODJOBS 个
+        生成的脚本使用POSIX shell命令, 在Windows上需要在MSYS等环境中执行.
+"""
+class BuildScriptWriter :
+    def __init__(self, **args) :
+        self.srcpath = args['srcpath']
+        self.dstpath = args['dstpath']
+        self.confarg = args['confarg']
+        self.makecmd = args['makecmd']
+        self.makearg = args['makearg']
+        self.makedoc = args['makedoc']
+        self.skiperr = args['skiperr']
+        self.modlist = args['modlist']
+        self.modjobs = max(1, int(args.get('modjobs', 1)))
+        self.bldpath = args.get('bldpath', 'build')
+        self.cachearg = ''
+        if args.get('ccache') and args.get('ccachearg') :
+            cache = CompilerCache(args['ccache'], args['ccachearg'])
+            self.cachearg = ' ' + cache.qmakeArgs()
+
+    def write          (self, path) :
+        if path.endswith('.sh') :
+            text = self.shellScript()
+        else :
+            text = self.makefile()
+        with open(path, 'wt', newline = '\n') as f :
+            f.write(text)
+        if path.endswith('.sh') :
+            os.chmod(path, 0o755)
+    def moduleDeps     (self, mod) :
+        names = [it.name for it in self.modlist]
+        return [it for it in mod.dependence if it in names]
+    def moduleLevels   (self) :
+        # 模块所在的批次: 比它依赖的所有模块的批次都大
+        levels = {}
+        for it in self.modlist :
+            levels[it.name] = 0
+        changed = True
+        while changed :
+            changed = False
+            for it in self.modlist :
+                for dep in self.moduleDeps(it) :
+                    if levels[it.name] <= levels[dep] :
+                        levels[it.name] = levels[dep] + 1
+                        changed = True
+        result = []
+        for it in self.modlist :
+            while len(result) <= levels[it.name] :
+                result.append([])
+            result[levels[it.name]].append(it)
+        return result
+    def configureCmd   (self, mod, srcvar, dstvar, argvar) :
+        if mod.type == ModuleType.QTBASE :
+            cmd = "{0}/qtbase/configure -prefix {1} {2}".format(srcvar,
+                                                               dstvar,
+                                                               argvar)
+        else :
+            cmd = "{0}/bin/qmake {1}/{2}".format(dstvar, srcvar, mod.name)
+        return cmd + self.cachearg
+    def makefile       (self) :
+        lines = [
+            "# 由 qt-builder 生成的QT编译脚本, 使用 make -jN 同时编译多个模块",
+            "SRCPATH = {0}".format(self.srcpath),
+            "DSTPATH = {0}".format(self.dstpath),
+            "BLDPATH = {0}".format(self.bldpath),
+            "CONFARG = {0}".format(self.confarg.strip()),
+            "MAKECMD = {0}".format(self.makecmd),
+            "MAKEARG = {0}".format(self.makearg),
+            "export PATH := $(PATH):$(DSTPATH)/bin",
+            "",
+            ".PHONY: all modules docs " + " ".join(it.name 
+                                                   for it in self.modlist),
+            "",
+            "all: modules" + (" docs" if self.makedoc else ""),
+            "",
+            "modules: " + " ".join(it.name for it in self.modlist),
+            ""
+        ]
+        ignore = "-" if self.skiperr else ""
+        for it in self.modlist :
+            stamp = "$(BLDPATH)/{0}/.qt-installed".format(it.name)
+            deps  = " ".join("$(BLDPATH)/{0}/.qt-installed".format(dep)
+                             for dep in self.moduleDeps(it))
+            cmd   = self.configureCmd(it, "$(SRCPATH)", "$(DSTPATH)", 
+                                      "$(CONFARG)")
+            lines += [
+                "{0}: {1}".format(it.name, stamp),
+                "{0}: {1}".format(stamp, deps).rstrip(),
+                "\t@echo '{0} 配置模块......'".format(it.name),
+                "\tmkdir -p $(BLDPATH)/{0}".format(it.name),
+                "\t{0}cd $(BLDPATH)/{1} && {2}".format(ignore, it.name, cmd),
+                "\t@echo '{0} 编译模块......'".format(it.name),
+                "\t+{0}cd $(BLDPATH)/{1} && $(MAKECMD) $(MAKEARG)".format(
+                    ignore, it.name),
+                "\t@echo '{0} 安装模块......'".format(it.name),
+                "\t+{0}cd $(BLDPATH)/{1} && $(MAKECMD) install".format(
+                    ignore, it.name),
+                "\tif [ -d $(SRCPATH)/{0}/examples ]; then "
+                "mkdir -p $(DSTPATH)/examples && "
+                "cp -R $(SRCPATH)/{0}/examples/. $(DSTPATH)/examples/; "
+                "fi".format(it.name),
+                "\ttouch $@",
+                ""
+            ]
+        # 文档在所有模块安装以后生成, 以便qdoc等工具已经可用
+        lines.append("docs: " + " ".join("docs-" + it.name 
+                                         for it in self.modlist))
+        lines.append("")
+        for it in self.modlist :
+            lines += [
+                "docs-{0}: modules".format(it.name),
+                "\t@echo '{0} 生成文档......'".format(it.name),
+                "\t+{0}cd $(BLDPATH)/{1} && $(MAKECMD) docs".format(
+                    ignore, it.name),
+                "\t+{0}cd $(BLDPATH)/{1} && $(MAKECMD) install_docs".format(
+                    ignore, it.name),
+                ""
+            ]
+        return "\n".join(lines)
+    def shellScript    (self) :
+        quote = shlex.quote
+        lines = [
+            "#!/bin/sh",
+            "# 由 qt-builder 生成的QT编译脚本, 环境变量 MODJOBS 指定同时编译"
+            "的模块数",
+            "SRCPATH={0}".format(quote(self.srcpath)),
+            "DSTPATH={0}".format(quote(self.dstpath)),
+            "BLDPATH={0}".format(quote(os.path.abspath(self.bldpath))),
+            "CONFARG={0}".format(quote(self.confarg.strip())),
+            "MAKECMD={0}".format(quote(self.makecmd)),
+            "MAKEARG={0}".format(quote(self.makearg)),
+            "SKIPERR={0}".format(1 if self.skiperr else 0),
+            "MODJOBS=${{MODJOBS:-{0}}}".format(self.modjobs),
+            'PATH="$PATH:$DSTPATH/bin"',
+            "export PATH",
+            "",
+            "PIDS=''",
+            "NJOBS=0",
+            "wait_jobs() {",
+            "    status=0",
+            "    for pid in $PIDS; do",
+            "        wait $pid || status=1",
+            "    done",
+            "    PIDS=''",
+            "    NJOBS=0",
+            '    if [ $status -ne 0 ] && [ "$SKIPERR" != 1 ]; then',
+            "        echo '编译QT时发生错误' >&2",
+            "        exit 1",
+            "    fi",
+            "}",
+            "start_job() {",
+            '    "$@" &',
+            '    PIDS="$PIDS $!"',
+            "    NJOBS=$((NJOBS + 1))",
+            "    if [ $NJOBS -ge $MODJOBS ]; then",
+            "        wait_jobs",
+            "    fi",
+            "}",
+            ""
+        ]
+        for it in self.modlist :
+            func = re.sub(r'\W', '_', it.name)
+            cmd  = self.configureCmd(it, '"$SRCPATH"', '"$DSTPATH"', 
+                                     '$CONFARG')
+            lines += [
+                "build_{0}() {{".format(func),
+                '    echo "{0} 开始编译"'.format(it.name),
+                '    mkdir -p "$BLDPATH/{0}" && '
+                'cd "$BLDPATH/{0}" || return 1'.format(it.name),
+                "    {0} || return 1".format(cmd),
+                "    $MAKECMD $MAKEARG || return 1",
+                "    $MAKECMD install || return 1",
+                '    if [ -d "$SRCPATH/{0}/examples" ]; then'.format(it.name),
+                '        mkdir -p "$DSTPATH/examples" && cp -R '
+                '"$SRCPATH/{0}/examples/." "$DSTPATH/examples/" '
+                '|| return 1'.format(it.name),
+                "    fi",
+                '    echo "{0} 编译完成"'.format(it.name),
+                "}",
+                "docs_{0}() {{".format(func),
+                '    cd "$BLDPATH/{0}" || return 1'.format(it.name),
+                "    $MAKECMD docs && $MAKECMD install_docs",
+                "}",
+                ""
+            ]
+        for level in self.moduleLevels() :
+            for it in level :
+                lines.append("start_job build_{0}".format(
+                    re.sub(r'\W', '_', it.name)))
+            lines.append("wait_jobs")
+        if self.makedoc :
+            for it in self.modlist :
+                lines.append("start_job docs_{0}".format(
+                    re.sub(r'\W', '_', it.name)))
+            lines.append("wait_jobs")
+        lines.append("")
+        return "\n".join(lines)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+    模块构建戳
+"""
+import os
+import json
+import hashlib
+
+
+def stampKey        (*items) :
+    data = json.dumps(items, sort_keys = True)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+"""
+    模块构建戳：
+        记录一个模块已经完成的构建阶段(configure, make, install, docs)以及完成时
+        使用的参数摘要, 保存在模块的shadow build目录中. 摘要没有变化的阶段可以
+        直接跳过; 某个阶段重新执行以后, 它之后的阶段全部失效.
+        setup 阶段表示shadow build目录本身, 它失效时目录会被清空.
+        restore 阶段表示安装路径中的文件是从产物缓存恢复的, 重新编译这个
+        模块时被清除.
+"""
+class BuildStamp :
+    PHASES   = ('setup', 'restore', 'configure', 'make', 'install', 'docs')
+    FILENAME = 'qt-builder.stamp'
+
+    def __init__(self, path, keys) :
+        self.path = os.path.join(path, BuildStamp.FILENAME)
+        self.keys = keys
+        self.done = {}
+        try :
+            with open(self.path, 'rt') as f :
+                self.done = json.load(f)
+        except (OSError, ValueError) :
+            self.done = {}
+
+    def isDone  (self, phase) :
+        return self.done.get(phase) == self.keys[phase]
+    def markDone(self, phase) :
+        index = BuildStamp.PHASES.index(phase)
+        for it in BuildStamp.PHASES[index:] :
+            self.done.pop(it, None)
+        self.done[phase] = self.keys[phase]
+        self.save()
+    def clear   (self, phase) :
+        if self.done.pop(phase, None) is not None :
+            self.save()
+    def save    (self) :
+        temp = self.path + '.tmp'
+        with open(temp, 'wt') as f :
+            json.dump(self.done, f)
+        os.replace(temp, self.path)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+    内存不足时减少同时运行的编译任务
+"""
+import os
+import time
+import threading
+
+from .profiler import processTable, childrenMap, descendants
+
+"""
+    内存节流：
+        在后台线程中每隔 interval 秒读取 /proc/meminfo 中的可用内存, 以及
+        本进程所有后代进程(编译器等)的内存占用. 可用内存低于 low 时从
+        jobserver中取走空闲的任务名额, 新的编译任务因此不会启动; 可用内存
+        恢复以后按照每个编译任务的平均内存占用逐个归还.
+        至少保留一个名额, 编译总能继续进行. 每次取走或者归还名额都通过
+        report(文本) 记录下来. 只支持Linux.
+"""
+class MemoryThrottle :
+    def __init__(self, jobserver, low = 0, jobmem = 512 << 20,
+                 interval = 0.5, report = None) :
+        self.jobserver = jobserver
+        self.low       = low or defaultLowMark()
+        self.jobmem    = jobmem
+        self.interval  = interval
+        self.report    = report
+        self.tokens    = []
+        self.events    = 0
+        self.stopped   = threading.Event()
+        self.thread    = threading.Thread(target = self.throttleThread,
+                                          name   = 'throttle',
+                                          daemon = True)
+
+    @staticmethod
+    def supported() :
+        return os.path.exists('/proc/meminfo')
+
+    def start (self) :
+        self.thread.start()
+        return self
+    def stop  (self) :
+        self.stopped.set()
+        self.thread.join()
+        for it in self.tokens :
+            self.jobserver.release(it)
+        self.tokens = []
+    def throttleThread(self) :
+        while not self.stopped.wait(self.interval) :
+            try :
+                self.update()
+            except OSError :
+                pass
+    def update(self) :
+        avail      = memAvailable()
+        count, rss = compileUsage()
+        # 每个编译任务需要的内存: 正在运行的编译进程的平均值, 至少 jobmem
+        perjob     = max(self.jobmem, rss // count if count else 0)
+        limit      = self.jobserver.jobs - 1
+
+        if avail < self.low :
+            need = (self.low - avail) // perjob + 1
+            took = 0
+            while took < need and len(self.tokens) < limit :
+                token = self.jobserver.tryAcquire()
+                if token is None :
+                    break
+                self.tokens.append(token)
+                took += 1
+            if took :
+                self.record("可用内存 {0} MB, 编译进程 {1} 个共 {2} MB, "
+                            "暂停 {3} 个任务名额(共暂停 {4} 个)",
+                            avail >> 20, count, rss >> 20, took,
+                            len(self.tokens))
+            return
+
+        if self.tokens and avail >= self.low + perjob :
+            count = min(len(self.tokens), (avail - self.low) // perjob)
+            for i in range(count) :
+                self.jobserver.release(self.tokens.pop())
+            self.record("可用内存 {0} MB, 恢复 {1} 个任务名额(仍暂停 {2} 个)",
+                        avail >> 20, count, len(self.tokens))
+    def record(self, text, *args) :
+        self.events += 1
+        if self.report is not None :
+            self.report(time.strftime('[%H:%M:%S] ') + text.format(*args))
+
+def memInfo() :
+    """ /proc/meminfo 中的各项, 单位为字节 """
+    info = {}
+    with open('/proc/meminfo') as file :
+        for line in file :
+            name, _, value = line.partition(':')
+            fields = value.split()
+            if fields :
+                info[name] = int(fields[0]) * 1024
+    return info
+def memAvailable() :
+    info = memInfo()
+    if 'MemAvailable' in info :
+        return info['MemAvailable']
+    # 老版本的内核没有MemAvailable
+    return info.get('MemFree', 0) + info.get('Cached', 0)
+def defaultLowMark() :
+    # 缺省在可用内存低于总内存的10%(至少1GB)时节流
+    if not MemoryThrottle.supported() :
+        return 1 << 30
+    return max(1 << 30, memInfo().get('MemTotal', 0) // 10)
+
+# 这些进程只是调度编译任务, 不计入编译进程的数量
+SHELLS = ('make', 'gmake', 'sh', 'bash', 'dash', 'python', 'python3')
+
+def compileUsage(root = None) :
+    """
+        root(缺省为本进程)的所有后代进程中编译进程的数量和总内存占用
+    """
+    root     = root or os.getpid()
+    table    = processTable()
+    children = childrenMap(table)
+    count    = 0
+    total    = 0
+    for pid in descendants(children, root) :
+        if table[pid].comm in SHELLS :
+            continue
+        count += 1
+        total += table[pid].rss
+    return count, total
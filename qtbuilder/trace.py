@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+    构建过程的计时记录, 输出为Chrome/Perfetto可以打开的trace event格式
+"""
+import os
+import time
+import json
+import threading
+
+"""
+    构建计时记录：
+        每个模块的每个阶段记录为一个区间(span), 包括开始时间, 持续时间,
+        子进程树消耗的CPU时间和退出码. 同一个线程中的区间显示在同一行,
+        所以在trace viewer中可以直接看到并行编译的关键路径和空闲时段.
+        save() 把所有区间写入JSON文件(chrome://tracing 或 ui.perfetto.dev)
+"""
+class BuildTrace :
+    def __init__(self) :
+        self.origin = time.perf_counter_ns()
+        self.lock   = threading.Lock()
+        self.events = []
+        self.tids   = {}
+
+    def now     (self) :
+        return time.perf_counter_ns()
+    def addSpan (self, name, cat, start, end = None, **args) :
+        """
+            记录一个区间, start/end 是 now() 的返回值. args中值为None
+            的项目不被记录
+        """
+        if end is None :
+            end = self.now()
+        event = {
+            'name': name,
+            'cat' : cat,
+            'ph'  : 'X',
+            'ts'  : (start - self.origin) / 1000.0,
+            'dur' : (end - start) / 1000.0,
+            'pid' : os.getpid(),
+            'tid' : self.threadId(),
+            'args': dict((k, v) for k, v in args.items() if v is not None)
+        }
+        with self.lock :
+            self.events.append(event)
+        return event
+    def threadId(self) :
+        # 线程标识换成从1开始的小整数, 并记录线程名称
+        ident = threading.get_ident()
+        with self.lock :
+            if ident not in self.tids :
+                self.tids[ident] = len(self.tids) + 1
+                self.events.append({
+                    'name': 'thread_name',
+                    'ph'  : 'M',
+                    'pid' : os.getpid(),
+                    'tid' : self.tids[ident],
+                    'args': {'name': threading.current_thread().name}
+                })
+            return self.tids[ident]
+    def save    (self, path) :
+        with self.lock :
+            data = {'traceEvents'    : list(self.events),
+                    'displayTimeUnit': 'ms'}
+        temp = path + '.tmp'
+        with open(temp, 'w') as file :
+            json.dump(data, file)
+        os.replace(temp, path)
+
+def waitProcess(proc) :
+    """
+        等待子进程结束, 返回 (退出码, 用户态CPU秒数, 内核态CPU秒数).
+        wait4返回的资源用量包含子进程等待过的所有后代进程(make调用的
+        编译器等); 没有wait4的平台(Windows)CPU时间为None
+    """
+    if not hasattr(os, 'wait4') :
+        return proc.wait(), None, None
+    try :
+        pid, status, usage = os.wait4(proc.pid, 0)
+    except ChildProcessError :
+        return proc.wait(), None, None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return (proc.returncode,
+            round(usage.ru_utime, 6),
+            round(usage.ru_stime, 6))
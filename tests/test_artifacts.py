@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+    产物缓存的测试
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtbuilder.artifacts import installTree, prefixPattern, relocate
+
+
+class RelocateTest(unittest.TestCase) :
+    def setUp(self) :
+        self.old = prefixPattern('/opt/qt')
+
+    def test_text(self) :
+        data = b'QMAKE_PRL_LIBS = -L/opt/qt/lib /opt/qt-other /opt/qt\n'
+        self.assertEqual(relocate(data, self.old, b'/home/me/Qt5', 'text'),
+                         b'QMAKE_PRL_LIBS = -L/home/me/Qt5/lib '
+                         b'/opt/qt-other /home/me/Qt5\n')
+
+    def test_binary_fits(self) :
+        data = b'\x7fELF\0qt_prfxpath=/opt/qt/lib\0\0\0\0\0\0end\0'
+        result = relocate(data, self.old, b'/opt/qt510', 'binary')
+        self.assertEqual(len(result), len(data))
+        self.assertEqual(result,
+                         b'\x7fELF\0qt_prfxpath=/opt/qt510/lib\0\0\0end\0')
+
+    def test_binary_shorter(self) :
+        data = b'\0/opt/qt/bin\0x'
+        self.assertEqual(relocate(data, self.old, b'/q', 'binary'),
+                         b'\0/q/bin' + b'\0' * 6 + b'x')
+
+    def test_binary_does_not_fit(self) :
+        # 字符串后面只有两个NUL, 新路径长了4个字节
+        data = b'\0/opt/qt/lib\0\0next'
+        self.assertIsNone(relocate(data, self.old, b'/opt/qt-5.10', 'binary'))
+        # 三个NUL时路径最多变长两个字节, 至少保留一个NUL
+        data = b'\0/opt/qt\0\0\0next'
+        self.assertIsNone(relocate(data, self.old, b'/opt/qt123', 'binary'))
+        self.assertEqual(relocate(data, self.old, b'/opt/qt12', 'binary'),
+                         b'\0/opt/qt12\0next')
+
+class InstallTreeTest(unittest.TestCase) :
+    def setUp   (self) :
+        self.root = tempfile.mkdtemp()
+    def tearDown(self) :
+        shutil.rmtree(self.root)
+
+    def write   (self, path, data) :
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        with open(path, 'w') as file :
+            file.write(data)
+
+    @unittest.skipIf(not hasattr(os, 'symlink') or sys.platform == "win32",
+                     "需要符号链接")
+    def test_replace_existing_links(self) :
+        stage  = os.path.join(self.root, 'stage')
+        prefix = os.path.join(self.root, 'prefix')
+        self.write(os.path.join(stage , 'lib', 'libQt5Core.so.5.10.0'), 'new')
+        os.symlink('libQt5Core.so.5.10.0',
+                   os.path.join(stage , 'lib', 'libQt5Core.so.5'))
+        self.write(os.path.join(prefix, 'lib', 'libQt5Core.so.5.10.0'), 'old')
+        self.write(os.path.join(prefix, 'lib', 'other.prl'), 'keep')
+        os.symlink('libQt5Core.so.5.9.0',
+                   os.path.join(prefix, 'lib', 'libQt5Core.so.5'))
+
+        installTree(stage, prefix)
+        link = os.path.join(prefix, 'lib', 'libQt5Core.so.5')
+        self.assertEqual(os.readlink(link), 'libQt5Core.so.5.10.0')
+        with open(link) as file :
+            self.assertEqual(file.read(), 'new')
+        self.assertTrue(os.path.exists(os.path.join(prefix, 'lib',
+                                                    'other.prl')))
+
+if __name__ == '__main__' :
+    unittest.main()
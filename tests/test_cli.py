@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+    命令行参数的测试
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtbuilder.cli import parseCommandLine
+
+
+class CommandLineTest(unittest.TestCase) :
+    def test_dash_values(self) :
+        _, opts = parseCommandLine(['-s', 'src',
+                                    '--make-args', '-j4',
+                                    '--config-args', '-opensource -static'])
+        self.assertEqual(opts.make_args  , '-j4')
+        self.assertEqual(opts.config_args, '-opensource -static')
+
+    def test_equals_form(self) :
+        _, opts = parseCommandLine(['-s', 'src', '--make-args=-j4 -k'])
+        self.assertEqual(opts.make_args, '-j4 -k')
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+    编译诊断信息索引的测试
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtbuilder.diagnostics import DiagnosticIndex
+
+
+class DiagnosticTest(unittest.TestCase) :
+    def setUp   (self) :
+        self.root  = tempfile.mkdtemp()
+        self.index = DiagnosticIndex(os.path.join(self.root, 'qt-build.diag'))
+    def tearDown(self) :
+        self.index.close()
+        shutil.rmtree(self.root)
+
+    def scan    (self, text) :
+        """ 扫描一行输出, 返回 (严重程度, 文件:行号), 没有匹配时返回None """
+        found = []
+        self.index.add = found.extend
+        self.index.scan('qtbase', 'make', text.encode('utf-8') + b'\n', 0)
+        if not found :
+            return None
+        return found[0].severity, found[0].location
+
+    def test_gcc(self) :
+        self.assertEqual(self.scan("src/foo.cpp:12:5: error: 'x' undeclared"),
+                         ('error', 'src/foo.cpp:12:5'))
+        self.assertEqual(self.scan("foo.h:3: warning: unused"),
+                         ('warning', 'foo.h:3'))
+
+    def test_mingw_drive_letter(self) :
+        self.assertEqual(
+            self.scan("C:/Qt/qtbase/src/foo.cpp:12:5: error: expected ';'"),
+            ('error', 'C:/Qt/qtbase/src/foo.cpp:12:5'))
+        self.assertEqual(
+            self.scan("c:\\qt\\a.cpp:1:2: fatal error: a.h: No such file"),
+            ('error', 'c:\\qt\\a.cpp:1:2'))
+        self.assertEqual(
+            self.scan("C:\\mingw\\bin\\g++.exe: fatal error: no input files"),
+            ('error', 'C:\\mingw\\bin\\g++'))
+        self.assertEqual(
+            self.scan("C:/Qt/a.cpp:(.text+0x1a): undefined reference to `f'"),
+            ('error', 'C:/Qt/a.cpp'))
+
+    def test_msvc(self) :
+        self.assertEqual(
+            self.scan("c:\\qt\\foo.cpp(12): error C2065: 'x': undeclared"),
+            ('error', 'c:\\qt\\foo.cpp(12)'))
+        self.assertEqual(
+            self.scan("C:\\qt\\foo.obj : error LNK2019: unresolved external"),
+            ('error', 'C:\\qt\\foo.obj'))
+
+    def test_make_and_qmake(self) :
+        self.assertEqual(
+            self.scan("make[2]: *** [Makefile:123: foo.o] Error 1"),
+            ('failed', ''))
+        self.assertEqual(self.scan("Project ERROR: Unknown module(s)"),
+                         ('error', ''))
+
+    def test_compile_command_is_not_error(self) :
+        self.assertIsNone(
+            self.scan("g++ -c -Werror -Wno-error=deprecated -o foo.o foo.cpp"))
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+    模块依赖图的测试
+"""
+import os
+import sys
+import unittest
+import collections
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtbuilder.graph import ModuleGraph
+
+Module = collections.namedtuple('Module', 'name dependence type')
+
+
+def modules(*items) :
+    return [Module(name, deps, 0) for name, deps in items]
+
+class GraphTest(unittest.TestCase) :
+    def test_order_follows_dependencies(self) :
+        graph = ModuleGraph(modules(('qtsvg'        , ['qtbase']),
+                                    ('qtdeclarative', ['qtbase', 'qtsvg']),
+                                    ('qtbase'       , [])))
+        names = [it.name for it in graph.order()]
+        self.assertEqual(names, ['qtbase', 'qtsvg', 'qtdeclarative'])
+        self.assertEqual(graph.closure('qtdeclarative'), {'qtbase', 'qtsvg'})
+        self.assertEqual(graph.dependents('qtbase'),
+                         {'qtsvg', 'qtdeclarative'})
+        self.assertEqual(graph.findCycle(), [])
+
+    def test_critical_path_first(self) :
+        # b后面还有一个很慢的模块c, 所以b比a先编译
+        graph = ModuleGraph(modules(('base', []),
+                                    ('a'   , ['base']),
+                                    ('b'   , ['base']),
+                                    ('c'   , ['b'])),
+                            {'base': 1, 'a': 10, 'b': 2, 'c': 20})
+        self.assertEqual(graph.critical['c'   ], 20)
+        self.assertEqual(graph.critical['b'   ], 22)
+        self.assertEqual(graph.critical['base'], 23)
+        names = [it.name for it in graph.order()]
+        self.assertEqual(names, ['base', 'b', 'c', 'a'])
+
+    def test_missing_weights_use_average(self) :
+        graph = ModuleGraph(modules(('a', []), ('b', [])), {'a': 4})
+        self.assertEqual(graph.weights['b'], 4)
+
+    def test_cycle(self) :
+        graph = ModuleGraph(modules(('base', []),
+                                    ('a'   , ['base', 'b']),
+                                    ('b'   , ['a'])))
+        cycle = graph.findCycle()
+        self.assertEqual(cycle[0], cycle[-1])
+        self.assertEqual(sorted(cycle[:-1]), ['a', 'b'])
+        names = [it.name for it in graph.order()]
+        self.assertEqual(sorted(names), ['a', 'b', 'base'])
+        self.assertEqual(names[0], 'base')
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+    make jobserver的测试
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtbuilder import jobserver
+from qtbuilder.jobserver import JobServer, isGnuMake, stripJobs
+
+
+class StripJobsTest(unittest.TestCase) :
+    def test_strip(self) :
+        self.assertEqual(stripJobs("-j4"), "")
+        self.assertEqual(stripJobs("-j 8 -k"), "-k")
+        self.assertEqual(stripJobs("-k --jobs=16 V=1"), "-k V=1")
+        self.assertEqual(stripJobs("-j"), "")
+        self.assertEqual(stripJobs("-k -jobfile"), "-k -jobfile")
+
+    def test_gnu_make(self) :
+        self.assertTrue (isGnuMake("make"))
+        self.assertTrue (isGnuMake("/usr/bin/gmake -s"))
+        self.assertTrue (isGnuMake("mingw32-make.exe"))
+        self.assertFalse(isGnuMake("nmake"))
+        self.assertFalse(isGnuMake("jom"))
+
+@unittest.skipIf(sys.platform == "win32", "POSIX管道")
+class JobServerTest(unittest.TestCase) :
+    @unittest.skipIf(not os.path.isdir('/proc/self/fd'), "需要/proc")
+    def test_try_acquire(self) :
+        server = JobServer(2).start()
+        try :
+            tokens = [server.tryAcquire(), server.tryAcquire()]
+            self.assertEqual(tokens, [JobServer.TOKEN] * 2)
+            self.assertIsNone(server.tryAcquire())
+            server.release(tokens.pop())
+            self.assertEqual(server.acquire(), JobServer.TOKEN)
+        finally :
+            server.stop()
+
+    def test_no_proc_reopen(self) :
+        # 不能重新打开管道时不能用dup代替, 否则阻塞的acquire也会受影响
+        server = JobServer(1).start()
+        try :
+            with mock.patch.object(jobserver.os, 'open',
+                                   side_effect = OSError) :
+                self.assertIsNone(server.tryAcquire())
+            self.assertEqual(server.acquire(), JobServer.TOKEN)
+        finally :
+            server.stop()
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+    编译进度统计的测试
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtbuilder.progress import BuildProgress
+
+
+class ProgressTest(unittest.TestCase) :
+    def setUp   (self) :
+        self.root = tempfile.mkdtemp()
+        history   = os.path.join(self.root, 'qt-build.progress.json')
+        self.progress = BuildProgress(['qtbase'], history)
+    def tearDown(self) :
+        shutil.rmtree(self.root)
+
+    def steps   (self, output) :
+        self.progress.startModule('qtbase')
+        count = self.progress.counter('qtbase')
+        count(output, 0)
+        return self.progress.running['qtbase'][0]
+
+    def test_compile_commands(self) :
+        output = (b"g++ -c -pipe -O2 -o qstring.o ../qstring.cpp\n"
+                  b"g++ -Wl,-O1 -shared -o libQt5Core.so.5.10.0 qstring.o\n")
+        self.assertEqual(self.steps(output), 1)
+
+    def test_silent_makefile(self) :
+        output = (b"compiling ../../corelib/tools/qstring.cpp\n"
+                  b"compiling ../../corelib/tools/qlist.cpp\n"
+                  b"linking ../../lib/libQt5Core.so.5.10.0\n")
+        self.assertEqual(self.steps(output), 2)
+
+    def test_msvc_source_echo(self) :
+        output = (b"qstring.cpp\r\n"
+                  b"qlist.cpp\r\n"
+                  b"   Creating library ..\\..\\lib\\Qt5Core.lib\r\n")
+        self.assertEqual(self.steps(output), 2)
+
+if __name__ == '__main__' :
+    unittest.main()
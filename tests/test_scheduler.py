@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+    模块构建调度器的测试
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtbuilder.scheduler import BuildScheduler
+
+
+class SchedulerTest(unittest.TestCase) :
+    def test_dependency_order(self) :
+        order = []
+        sched = BuildScheduler(2)
+        sched.addTask('b', lambda : order.append('b') or True, ['a'])
+        sched.addTask('a', lambda : order.append('a') or True)
+        self.assertTrue(sched.run())
+        self.assertEqual(order, ['a', 'b'])
+
+    def test_keep_going_reports_failure(self) :
+        order = []
+        sched = BuildScheduler(1)
+        sched.addTask('a', lambda : False)
+        sched.addTask('b', lambda : order.append('b') or True, ['a'])
+        sched.addTask('c', lambda : order.append('c') or True)
+        self.assertFalse(sched.run(keepGoing = True))
+        self.assertEqual(order, ['c'])
+        self.assertEqual(sched.causes['b'], ['a'])
+
+    def test_cycle_fails(self) :
+        order = []
+        sched = BuildScheduler(2)
+        sched.addTask('a', lambda : order.append('a') or True, ['b'])
+        sched.addTask('b', lambda : order.append('b') or True, ['a'])
+        sched.addTask('c', lambda : order.append('c') or True)
+        self.assertFalse(sched.run(keepGoing = True))
+        self.assertEqual(order, ['c'])
+        self.assertEqual(sorted(sched.blocked), ['a', 'b'])
+        self.assertFalse(sched.results['a'])
+        self.assertFalse(sched.results['b'])
+        self.assertTrue (sched.results['c'])
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+    模块构建戳和构建日志(journal)的测试
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qtbuilder.stamp   import BuildStamp, stampKey
+from qtbuilder.journal import BuildJournal
+
+
+def moduleKeys(source) :
+    keys = {}
+    keys['setup'    ] = stampKey('setup', '-opensource')
+    keys['restore'  ] = stampKey(keys['setup'], 'artifact')
+    keys['configure'] = stampKey(keys['setup'], source)
+    keys['make'     ] = stampKey(keys['configure'], 'make', '-j4')
+    keys['install'  ] = stampKey(keys['make'])
+    keys['docs'     ] = stampKey(keys['install'])
+    return keys
+
+class StampTest(unittest.TestCase) :
+    def setUp   (self) :
+        self.root = tempfile.mkdtemp()
+    def tearDown(self) :
+        shutil.rmtree(self.root)
+
+    def test_persist(self) :
+        stamp = BuildStamp(self.root, moduleKeys('src1'))
+        for it in ('setup', 'configure', 'make', 'install') :
+            stamp.markDone(it)
+        stamp = BuildStamp(self.root, moduleKeys('src1'))
+        self.assertTrue (stamp.isDone('install'))
+        self.assertFalse(stamp.isDone('docs'))
+
+    def test_source_change(self) :
+        stamp = BuildStamp(self.root, moduleKeys('src1'))
+        for it in ('setup', 'configure', 'make', 'install') :
+            stamp.markDone(it)
+        stamp = BuildStamp(self.root, moduleKeys('src2'))
+        self.assertTrue (stamp.isDone('setup'))
+        self.assertFalse(stamp.isDone('configure'))
+        self.assertFalse(stamp.isDone('make'))
+        self.assertFalse(stamp.isDone('install'))
+
+    def test_redo_invalidates_later(self) :
+        stamp = BuildStamp(self.root, moduleKeys('src1'))
+        for it in ('setup', 'configure', 'make', 'install', 'docs') :
+            stamp.markDone(it)
+        stamp.markDone('make')
+        self.assertTrue (stamp.isDone('configure'))
+        self.assertFalse(stamp.isDone('install'))
+        self.assertFalse(stamp.isDone('docs'))
+
+    def test_restore(self) :
+        stamp = BuildStamp(self.root, moduleKeys('src1'))
+        stamp.markDone('setup')
+        stamp.markDone('restore')
+        # 恢复的模块生成文档之前要配置, 配置不能清除恢复记录
+        stamp.markDone('configure')
+        self.assertTrue(stamp.isDone('restore'))
+        stamp.clear('restore')
+        stamp = BuildStamp(self.root, moduleKeys('src1'))
+        self.assertFalse(stamp.isDone('restore'))
+        self.assertTrue (stamp.isDone('configure'))
+
+class JournalTest(unittest.TestCase) :
+    def setUp   (self) :
+        self.root = tempfile.mkdtemp()
+    def tearDown(self) :
+        shutil.rmtree(self.root)
+
+    def test_resume(self) :
+        journal = BuildJournal(self.root, 'key1')
+        self.assertFalse(journal.open(resume = True))
+        journal.record('qtbase', 'docs', 'docs1')
+        journal.close()
+        # 写了一半的最后一行被丢弃
+        with open(journal.path, 'ab') as file :
+            file.write(b'{"module": "qtsvg", "pha')
+
+        journal = BuildJournal(self.root, 'key1')
+        self.assertTrue(journal.open(resume = True))
+        self.assertTrue (journal.isDone('qtbase', 'docs', 'docs1'))
+        self.assertFalse(journal.isDone('qtbase', 'docs', 'docs2'))
+        self.assertFalse(journal.isDone('qtsvg' , 'docs', 'docs1'))
+        journal.record('qtsvg', 'docs', 'docs1')
+        journal.close()
+        with open(journal.path, 'rb') as file :
+            self.assertEqual(len(file.read().splitlines()), 3)
+
+    def test_parameters_changed(self) :
+        journal = BuildJournal(self.root, 'key1')
+        journal.open()
+        journal.record('qtbase', 'docs', 'docs1')
+        journal.close()
+        journal = BuildJournal(self.root, 'key2')
+        self.assertFalse(journal.open(resume = True))
+        self.assertFalse(journal.isDone('qtbase', 'docs', 'docs1'))
+        journal.close()
+
+if __name__ == '__main__' :
+    unittest.main()